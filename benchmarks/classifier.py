@@ -0,0 +1,124 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+# Measure per-request cost of matching snmp-context-id and
+# snmp-content-id patterns.
+#
+# Compares matching every pattern in configuration order (as it used
+# to be done) against the compiled RegExpClassifier, for a growing
+# number of configured pattern groups. Both must yield the same ID.
+#
+# Example:
+#
+#   python benchmarks/classifier.py --groups=10,100,1000,5000
+#
+import os
+import re
+import sys
+import getopt
+import random
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from snmpresponder.classifier import RegExpClassifier
+
+HELP_MESSAGE = """\
+Usage: %s [--help]
+    [--groups=<count[,count...]>]
+    [--keys=<count>]
+    [--rounds=<count>]
+    [--seed=<number>]
+""" % sys.argv[0]
+
+SCENARIOS = (
+    ('context-id, wildcard engine-id',
+     lambda idx: r'.*?#ctx-name-%d$' % idx,
+     lambda idx: '0x8000#ctx-name-%d' % idx),
+    ('context-id, literal engine-id',
+     lambda idx: r'0x80%04d#.*?' % idx,
+     lambda idx: '0x80%04d#ctx' % idx),
+    ('content-id, OID prefixes',
+     lambda idx: r'GET#1\.3\.6\.1\.4\.1\.%d\..*?' % idx,
+     lambda idx: 'GET#' + '|'.join(['1.3.6.1.4.1.%d.1.%d' % (idx, x) for x in range(20)]))
+)
+
+
+def main():
+    groupsCounts = [10, 100, 1000, 5000]
+    keysCount = 200
+    rounds = 5
+    seed = 1
+
+    try:
+        opts, params = getopt.getopt(sys.argv[1:], 'h', [
+            'help', 'groups=', 'keys=', 'rounds=', 'seed='
+        ])
+
+    except Exception:
+        sys.stderr.write('ERROR: %s\r\n%s\r\n' % (sys.exc_info()[1], HELP_MESSAGE))
+        return 1
+
+    for opt in opts:
+        if opt[0] == '-h' or opt[0] == '--help':
+            sys.stderr.write(HELP_MESSAGE)
+            return 0
+
+        elif opt[0] == '--groups':
+            groupsCounts = [int(x) for x in opt[1].split(',')]
+
+        elif opt[0] == '--keys':
+            keysCount = int(opt[1])
+
+        elif opt[0] == '--rounds':
+            rounds = int(opt[1])
+
+        elif opt[0] == '--seed':
+            seed = int(opt[1])
+
+    random.seed(seed)
+
+    sys.stdout.write('Python %s, %d keys per round, best of %d rounds\r\n' % (
+        sys.version.split()[0], keysCount, rounds))
+
+    for title, makePattern, makeKey in SCENARIOS:
+        sys.stdout.write('%s\r\n' % title)
+
+        for groupsCount in groupsCounts:
+            patterns = [('id%d' % idx, makePattern(idx)) for idx in range(groupsCount)]
+
+            classifier = RegExpClassifier()
+
+            for value, pattern in patterns:
+                classifier.add(value, pattern)
+
+            classifier.compile()
+
+            linearList = [(value, re.compile(pattern)) for value, pattern in patterns]
+
+            def linear(key):
+                for value, regExp in linearList:
+                    if regExp.match(key):
+                        return value
+
+            keys = [makeKey(random.randrange(groupsCount)) for _ in range(keysCount)]
+
+            for key in keys:
+                if classifier.match(key) != linear(key):
+                    sys.stderr.write('ERROR: classifiers disagree on key %s\r\n' % key)
+                    return 1
+
+            linearTime = min(timeit.repeat(lambda: [linear(x) for x in keys], number=1, repeat=rounds))
+            compiledTime = min(timeit.repeat(lambda: [classifier.match(x) for x in keys], number=1, repeat=rounds))
+
+            sys.stdout.write('  groups %5d  linear %9.1fus  compiled %9.1fus\r\n' % (
+                groupsCount, linearTime / keysCount * 1e6, compiledTime / keysCount * 1e6))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
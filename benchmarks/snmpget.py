@@ -0,0 +1,303 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+# Measure throughput and latency of a running snmpresponderd.
+#
+# Keeps a window of SNMPv2c GET requests in flight against the daemon,
+# reports requests per second and response time percentiles. Messages
+# are BER-encoded right here so that the load generator stays cheap
+# and does not need pysnmp.
+#
+# Example (compare I/O engines):
+#
+#   snmpresponderd --config-file=examples/conf/asyncio-backend/snmpresponderd.conf --io-engine=asyncore
+#   python benchmarks/snmpget.py --endpoint=127.0.0.1:1161 --oid=1.3.6.1.2.1.1.5.0
+#
+#   snmpresponderd --config-file=examples/conf/asyncio-backend/snmpresponderd.conf --io-engine=asyncio
+#   python benchmarks/snmpget.py --endpoint=127.0.0.1:1161 --oid=1.3.6.1.2.1.1.5.0
+#
+# Endpoint starting with a slash is a UNIX domain socket path (compare
+# with UDP by configuring both transports in the same daemon):
+#
+#   python benchmarks/snmpget.py --endpoint=/var/run/snmpresponder.sock
+#
+import os
+import sys
+import getopt
+import socket
+import struct
+import tempfile
+import time
+from collections import deque
+
+HELP_MESSAGE = """\
+Usage: %s [--help]
+    [--endpoint=<host:port|/socket/path>]
+    [--community=<name>]
+    [--oid=<oid>]
+    [--requests=<count>]
+    [--window=<count>]
+    [--timeout=<seconds>]
+""" % sys.argv[0]
+
+RESPONSE_PDU = 0xa2
+
+
+def encodeLength(length):
+    if length < 0x80:
+        return struct.pack('B', length)
+
+    octets = []
+
+    while length:
+        octets.insert(0, length & 0xff)
+        length >>= 8
+
+    return struct.pack('B', 0x80 | len(octets)) + struct.pack('%dB' % len(octets), *octets)
+
+
+def encodeTlv(tag, value):
+    return struct.pack('B', tag) + encodeLength(len(value)) + value
+
+
+def encodeInteger(value):
+    octets = []
+
+    while True:
+        octets.insert(0, value & 0xff)
+        if -0x80 <= value < 0x80:
+            break
+        value >>= 8
+
+    return encodeTlv(0x02, struct.pack('%dB' % len(octets), *octets))
+
+
+def encodeOid(oid):
+    arcs = [int(x) for x in oid.strip('.').split('.')]
+    arcs[:2] = [arcs[0] * 40 + arcs[1]]
+
+    octets = []
+
+    for arc in arcs:
+        chunk = [arc & 0x7f]
+        arc >>= 7
+
+        while arc:
+            chunk.insert(0, 0x80 | arc & 0x7f)
+            arc >>= 7
+
+        octets.extend(chunk)
+
+    return encodeTlv(0x06, struct.pack('%dB' % len(octets), *octets))
+
+
+def encodeGetRequest(community, oid, requestId):
+    varBinds = encodeTlv(0x30, encodeTlv(0x30, encodeOid(oid) + encodeTlv(0x05, b'')))
+
+    pdu = encodeTlv(0xa0, encodeInteger(requestId) + encodeInteger(0) + encodeInteger(0) + varBinds)
+
+    return encodeTlv(0x30, encodeInteger(1) + encodeTlv(0x04, community) + pdu)
+
+
+def decodeTlv(octets, offset):
+    """Return tag, value offset, value end offset"""
+    tag, length = struct.unpack('BB', octets[offset:offset + 2])
+
+    offset += 2
+
+    if length & 0x80:
+        size = length & 0x7f
+        length = 0
+
+        for octet in struct.unpack('%dB' % size, octets[offset:offset + size]):
+            length = length << 8 | octet
+
+        offset += size
+
+    return tag, offset, offset + length
+
+
+def decodeInteger(octets, offset):
+    tag, start, end = decodeTlv(octets, offset)
+
+    value = 0
+
+    for octet in struct.unpack('%dB' % (end - start), octets[start:end]):
+        value = value << 8 | octet
+
+    if end > start and struct.unpack('B', octets[start:start + 1])[0] & 0x80:
+        value -= 1 << (8 * (end - start))
+
+    return value, end
+
+
+def decodeResponse(octets):
+    """Return request ID and error status of SNMP response message"""
+    tag, offset, end = decodeTlv(octets, 0)
+
+    # skip version and community
+    tag, start, offset = decodeTlv(octets, offset)
+    tag, start, offset = decodeTlv(octets, offset)
+
+    tag, offset, end = decodeTlv(octets, offset)
+
+    if tag != RESPONSE_PDU:
+        raise ValueError('unexpected PDU type %x' % tag)
+
+    requestId, offset = decodeInteger(octets, offset)
+    errorStatus, offset = decodeInteger(octets, offset)
+
+    return requestId, errorStatus
+
+
+def getPercentile(samples, percent):
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100.0))]
+
+
+def run(sock, address, community, oid, requestsCount, window, timeout):
+    community = community.encode('ascii')
+
+    inFlight = {}
+    sendOrder = deque()
+    latencies = []
+    errors = lost = 0
+    requestId = 0
+
+    startedAt = time.time()
+
+    while len(latencies) + errors + lost < requestsCount:
+
+        while len(inFlight) < window and requestId < requestsCount:
+            requestId += 1
+            inFlight[requestId] = time.time()
+            sendOrder.append(requestId)
+            sock.sendto(encodeGetRequest(community, oid, requestId), address)
+
+        try:
+            octets = sock.recv(65535)
+
+        except socket.timeout:
+            octets = None
+
+        # unanswered requests free their window slots on timeout
+        expireAt = time.time() - timeout
+
+        while sendOrder and (sendOrder[0] not in inFlight or
+                             inFlight[sendOrder[0]] < expireAt):
+            if inFlight.pop(sendOrder.popleft(), None) is not None:
+                lost += 1
+
+        if octets is None:
+            continue
+
+        rspRequestId, errorStatus = decodeResponse(octets)
+
+        sentAt = inFlight.pop(rspRequestId, None)
+
+        if sentAt is None:
+            # late response to a request already counted as lost
+            continue
+
+        if errorStatus:
+            errors += 1
+
+        else:
+            latencies.append(time.time() - sentAt)
+
+    elapsed = time.time() - startedAt
+
+    latencies.sort()
+
+    sys.stdout.write(
+        'requests %d, responses %d, errors %d, lost %d in %.3f seconds\r\n' % (
+            requestsCount, len(latencies), errors, lost, elapsed))
+
+    sys.stdout.write('throughput %.1f req/s\r\n' % (len(latencies) / elapsed))
+
+    if latencies:
+        sys.stdout.write(
+            'latency p50 %.3f ms, p90 %.3f ms, p99 %.3f ms, max %.3f ms\r\n' % tuple(
+                getPercentile(latencies, x) * 1000 for x in (50, 90, 99, 100)))
+
+    return 0
+
+
+def main():
+    endpoint = '127.0.0.1:161'
+    community = 'public'
+    oid = '1.3.6.1.2.1.1.1.0'
+    requestsCount = 10000
+    window = 16
+    timeout = 1.0
+
+    try:
+        opts, params = getopt.getopt(sys.argv[1:], 'h', [
+            'help', 'endpoint=', 'community=', 'oid=', 'requests=',
+            'window=', 'timeout='
+        ])
+
+    except Exception:
+        sys.stderr.write('ERROR: %s\r\n%s\r\n' % (sys.exc_info()[1], HELP_MESSAGE))
+        return 1
+
+    for opt in opts:
+        if opt[0] == '-h' or opt[0] == '--help':
+            sys.stderr.write(HELP_MESSAGE)
+            return 0
+
+        elif opt[0] == '--endpoint':
+            endpoint = opt[1]
+
+        elif opt[0] == '--community':
+            community = opt[1]
+
+        elif opt[0] == '--oid':
+            oid = opt[1]
+
+        elif opt[0] == '--requests':
+            requestsCount = int(opt[1])
+
+        elif opt[0] == '--window':
+            window = int(opt[1])
+
+        elif opt[0] == '--timeout':
+            timeout = float(opt[1])
+
+    localPath = None
+
+    if endpoint.startswith('/'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+        # responses come back to the path we are bound to
+        localPath = os.path.join(tempfile.mkdtemp(), 'snmpget.sock')
+        sock.bind(localPath)
+
+        address = endpoint
+
+    else:
+        host, port = endpoint.rsplit(':', 1)
+
+        address = socket.getaddrinfo(host, int(port), 0, socket.SOCK_DGRAM)[0]
+
+        sock = socket.socket(address[0], socket.SOCK_DGRAM)
+
+        address = address[4]
+
+    sock.settimeout(timeout)
+
+    try:
+        return run(sock, address, community, oid, requestsCount, window, timeout)
+
+    finally:
+        sock.close()
+
+        if localPath:
+            os.remove(localPath)
+            os.rmdir(os.path.dirname(localPath))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
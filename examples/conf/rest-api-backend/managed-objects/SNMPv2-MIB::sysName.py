@@ -12,9 +12,9 @@ Produced by pysmi-0.4.0 at Sun Jan 13 09:39:06 2019
 On host igarlic platform Darwin version 17.7.0 by user ilya
 Using Python version 3.6.0 (v3.6.0:41df79263a11, Dec 22 2016, 17:23:13)
 """
-import concurrent.futures
-import urllib.request
-import json
+from pysnmp.smi import error as smi_error
+
+from snmpresponder.coalesce import Coalescer
 
 if 'mibBuilder' not in globals():
     import sys
@@ -36,14 +36,18 @@ MibScalarInstance, = mibBuilder.importSymbols(
 )
 
 
-# Persistent threaded executor
+# HTTP client keeping REST API connections alive, runs requests
+# in the thread pool shared by all MIB implementations
+
+httpClient = userCtx['httpClient']
 
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+# Concurrent requests share in-flight REST API calls
 
+coalescer = Coalescer()
 
-def load_url(url, timeout):
-    with urllib.request.urlopen(url, timeout=timeout) as conn:
-        return json.loads(conn.read())
+# Fail fast while REST API is down
+
+circuitBreaker = userCtx['circuitBreakers'].get('redfish')
 
 
 # MIB Managed Objects in the order of their OIDs
@@ -62,10 +66,18 @@ class SysnameObjectInstance(MibScalarInstance):
 
         name, value = varBind
 
-        future = executor.submit(load_url, self.REDFISH_SYSTEM_URL, 5)
+        future = coalescer.submit(
+            self.REDFISH_SYSTEM_URL, circuitBreaker.submit,
+            httpClient.submitJson, self.REDFISH_SYSTEM_URL
+        )
 
         def done_callback(future):
-            rsp = future.result()
+            try:
+                rsp = future.result()
+
+            except Exception:
+                cbFun(varBind, **dict(context, error=smi_error.GenError()))
+                return
 
             value = self.syntax.clone(rsp.get('HostName', ''))
 
@@ -0,0 +1,117 @@
+"""SNMP MIB module (SNMPv2-MIB) expressed in pysnmp data model.
+
+This Python module is designed to be imported and executed by the
+pysnmp library.
+
+See http://snmplabs.com/pysnmp for further information.
+
+Notes
+-----
+ASN.1 source file:///usr/share/snmp/mibs/SNMPv2-MIB.txt
+Produced by pysmi-0.4.0 at Sun Jan 13 09:39:06 2019
+On host igarlic platform Darwin version 17.7.0 by user ilya
+Using Python version 3.6.0 (v3.6.0:41df79263a11, Dec 22 2016, 17:23:13)
+"""
+from pysnmp.smi import error as smi_error
+
+from snmpresponder.batch import BatchReader, BatchReadMixIn
+
+if 'mibBuilder' not in globals():
+    import sys
+
+    sys.stderr.write(__doc__)
+    sys.exit(1)
+
+
+MibScalarInstance, = mibBuilder.importSymbols(
+    'SNMPv2-SMI',
+    'MibScalarInstance'
+)
+
+# Import Managed Objects to base Managed Objects Instances on
+
+(sysDescr,
+ sysContact,
+ sysName) = mibBuilder.importSymbols(
+    "SNMPv2-MIB",
+    "sysDescr",
+    "sysContact",
+    "sysName"
+)
+
+
+# HTTP client keeping REST API connections alive, runs requests
+# in the thread pool shared by all MIB implementations
+
+httpClient = userCtx['httpClient']
+
+
+class RedfishSystemReader(BatchReader):
+    """Read all requested system objects in one REST API call"""
+
+    REDFISH_SYSTEM_URL = 'http://demo.snmplabs.com/redfish/v1/Systems/437XR1138R2'
+
+    # MIB object instance OID -> REST API document field
+    REDFISH_FIELDS = {
+        sysDescr.name + (0,): 'Description',
+        sysContact.name + (0,): 'Manufacturer',
+        sysName.name + (0,): 'HostName'
+    }
+
+    def readBatch(self, requests):
+        future = httpClient.submitJson(self.REDFISH_SYSTEM_URL)
+
+        def done_callback(future):
+            try:
+                rsp = future.result()
+
+            except Exception:
+                for mibObject, varBind, context in requests:
+                    cbFun = context['cbFun']
+                    cbFun(varBind, **dict(context, error=smi_error.GenError()))
+                return
+
+            for mibObject, (name, value), context in requests:
+                cbFun = context['cbFun']
+
+                field = self.REDFISH_FIELDS[mibObject.name]
+
+                value = mibObject.syntax.clone(rsp.get(field, ''))
+
+                cbFun((name, value), **context)
+
+        future.add_done_callback(done_callback)
+
+
+# MIB Managed Objects in the order of their OIDs
+
+class SystemObjectInstance(BatchReadMixIn, MibScalarInstance):
+    batchReader = RedfishSystemReader()
+
+
+_sysDescr = SystemObjectInstance(
+     sysDescr.name,
+     (0,),
+     sysDescr.syntax
+)
+
+_sysContact = SystemObjectInstance(
+     sysContact.name,
+     (0,),
+     sysContact.syntax
+)
+
+_sysName = SystemObjectInstance(
+     sysName.name,
+     (0,),
+     sysName.syntax
+)
+
+# Export Managed Objects Instances to the MIB builder
+
+mibBuilder.exportSymbols(
+    "__SNMPv2-MIB",
+    **{"sysDescr": _sysDescr,
+       "sysContact": _sysContact,
+       "sysName": _sysName}
+)
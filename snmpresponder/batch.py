@@ -0,0 +1,119 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+
+from pysnmp.smi import error as smi_error
+
+from snmpresponder import log
+
+
+class BatchReader(object):
+    """Read values of many MIB object instances in one backend call.
+
+    MIB object instances mixing in `BatchReadMixIn` share a batch reader.
+    Var-binds of an SNMP request owned by these instances are gathered
+    up and passed to `readBatch()` at once.
+    """
+    def readBatch(self, requests):
+        """Read var-binds in bulk.
+
+        The *requests* is a list of `(mibObject, varBind, context)`
+        tuples. For each request, `context['cbFun']` must be eventually
+        called with the resulting var-bind and the *context*.
+        """
+        raise NotImplementedError()
+
+
+class BatchCollector(object):
+    """Gather var-binds of one SNMP request per batch reader.
+
+    Until `flush()` is called, var-binds are queued up. Var-binds
+    arriving after flush (e.g. from asynchronous MIB objects) are
+    read right away.
+    """
+    def __init__(self):
+        # batch reader -> list of (mibObject, varBind, context)
+        self._batches = {}
+        self._readers = []
+        self._flushed = False
+
+    def add(self, reader, mibObject, varBind, context):
+        if self._flushed:
+            readBatch(reader, [(mibObject, varBind, context)])
+            return
+
+        try:
+            self._batches[reader].append((mibObject, varBind, context))
+
+        except KeyError:
+            self._batches[reader] = [(mibObject, varBind, context)]
+            self._readers.append(reader)
+
+    def flush(self):
+        self._flushed = True
+
+        batches, self._batches = self._batches, {}
+        readers, self._readers = self._readers, []
+
+        for reader in readers:
+            readBatch(reader, batches[reader])
+
+
+def readBatch(reader, requests):
+    try:
+        reader.readBatch(requests)
+
+    except Exception:
+        log.error('batch read of %s var-bind(s) failed: %s' % (len(requests), sys.exc_info()[1]))
+
+        for mibObject, varBind, context in requests:
+            context['cbFun'](varBind, **dict(context, error=smi_error.GenError()))
+
+
+class BatchReadMixIn(object):
+    """Let MIB object instance be read along with others.
+
+    To be mixed into `MibScalarInstance` or `MibTableColumn`
+    subclasses, the `batchReader` attribute must refer to a
+    `BatchReader` instance. Write operations are not batched.
+    """
+    batchReader = None
+
+    def _readBatched(self, varBind, **context):
+        collector = context.get('batchCollector')
+        if collector is None:
+            readBatch(self.batchReader, [(self, varBind, context)])
+
+        else:
+            collector.add(self.batchReader, self, varBind, context)
+
+    def readTest(self, varBind, **context):
+        # the value is read and checked later on
+        cbFun = context['cbFun']
+        cbFun(varBind, **context)
+
+    def readGet(self, varBind, **context):
+        self._readBatched(varBind, **context)
+
+    def readTestNext(self, varBind, **context):
+        name, value = varBind
+
+        if name >= self.name:
+            super(BatchReadMixIn, self).readTestNext(varBind, **context)
+
+        else:
+            cbFun = context['cbFun']
+            cbFun((self.name, value), **context)
+
+    def readGetNext(self, varBind, **context):
+        name, value = varBind
+
+        if name >= self.name:
+            super(BatchReadMixIn, self).readGetNext(varBind, **context)
+
+        else:
+            self._readBatched((self.name, value), **context)
@@ -0,0 +1,185 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import time
+import threading
+
+try:
+    from concurrent import futures
+
+except ImportError:
+    futures = None
+
+from snmpresponder.error import CircuitOpenError
+from snmpresponder import log
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker(object):
+    """Fail backend calls fast while the backend seems to be down.
+
+    After *failureThreshold* consecutive failures the breaker opens and
+    calls are rejected. Once *resetTimeout* seconds pass, one call is
+    let through to probe the backend, its outcome closes or re-opens
+    the breaker. The probe not completed in *probeTimeout* seconds
+    (*resetTimeout* by default) counts as failed, its late outcome is
+    ignored. So are outcomes of the calls made before the breaker
+    opened.
+    """
+    def __init__(self, name, failureThreshold, resetTimeout, probeTimeout=None):
+        self.name = name
+        self._failureThreshold = failureThreshold
+        self._resetTimeout = resetTimeout
+        self._probeTimeout = resetTimeout if probeTimeout is None else probeTimeout
+        # backend calls may complete in other threads
+        self._lock = threading.Lock()
+        # ID of the probe call in flight, if any
+        self._probeId = None
+        self._probeCount = 0
+        self.state = CLOSED
+        self.failures = 0
+        self.openedAt = 0
+        self.probedAt = 0
+        self.trips = 0
+        self.rejected = 0
+
+    def admit(self):
+        """Return (allowed, probe ID or `None`).
+
+        The probe ID should be passed to `success()` or `failure()`
+        along with the outcome of the backend call.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True, None
+
+            now = time.time()
+
+            if self.state == HALF_OPEN and now - self.probedAt >= self._probeTimeout:
+                log.info('circuit breaker %s probe timed out' % self.name)
+                self._failure(now)
+
+            if self.state == OPEN and now - self.openedAt >= self._resetTimeout:
+                self._setState(HALF_OPEN)
+                self._probeCount += 1
+                self._probeId = self._probeCount
+                self.probedAt = now
+                return True, self._probeId
+
+            self.rejected += 1
+
+            return False, None
+
+    def allow(self):
+        """Return True if backend call can be made"""
+        return self.admit()[0]
+
+    def _isCurrent(self, probeId):
+        if probeId is None:
+            # call made while closed, late if the breaker has opened since
+            return self.state == CLOSED
+
+        return probeId == self._probeId
+
+    def success(self, probeId=None):
+        with self._lock:
+            if not self._isCurrent(probeId):
+                return
+
+            self._probeId = None
+            self.failures = 0
+
+            if self.state != CLOSED:
+                self._setState(CLOSED)
+
+    def failure(self, probeId=None):
+        with self._lock:
+            if not self._isCurrent(probeId):
+                return
+
+            self._failure(time.time())
+
+    def _failure(self, now):
+        self._probeId = None
+        self.failures += 1
+
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self._failureThreshold):
+            self.openedAt = now
+            self.trips += 1
+            self._setState(OPEN)
+
+    def submit(self, startFun, *args, **kwargs):
+        """Start backend call unless the breaker is open.
+
+        The `startFun(*args, **kwargs)` must return a future, its
+        outcome is accounted by the breaker. If the breaker is open,
+        the returned future fails with `CircuitOpenError` right away.
+        Exception raised by `startFun()` counts as failure and gets
+        propagated.
+        """
+        allowed, probeId = self.admit()
+
+        if not allowed:
+            future = futures.Future()
+            future.set_exception(CircuitOpenError('circuit breaker %s is open' % self.name))
+            return future
+
+        try:
+            future = startFun(*args, **kwargs)
+
+        except Exception:
+            self.failure(probeId)
+            raise
+
+        future.add_done_callback(lambda x: self._done(x, probeId))
+
+        return future
+
+    def _done(self, future, probeId=None):
+        if future.cancelled() or future.exception() is not None:
+            self.failure(probeId)
+
+        else:
+            self.success(probeId)
+
+    def _setState(self, state):
+        log.info('circuit breaker %s is %s (%s consecutive failures)' % (self.name, state, self.failures))
+        self.state = state
+
+
+class CircuitBreakers(object):
+    """Circuit breakers keyed on backend (or MIB object) name"""
+    def __init__(self, failureThreshold, resetTimeout):
+        self._failureThreshold = failureThreshold
+        self._resetTimeout = resetTimeout
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def __len__(self):
+        return len(self._breakers)
+
+    def get(self, name):
+        with self._lock:
+            try:
+                return self._breakers[name]
+
+            except KeyError:
+                breaker = CircuitBreaker(name, self._failureThreshold, self._resetTimeout)
+                self._breakers[name] = breaker
+                return breaker
+
+    def getStats(self):
+        breakers = list(self._breakers.values())
+
+        return {
+            'breakers': len(breakers),
+            'open': ','.join([x.name for x in breakers if x.state != CLOSED]) or '-',
+            'trips': sum([x.trips for x in breakers]),
+            'rejected': sum([x.rejected for x in breakers])
+        }
@@ -0,0 +1,67 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+from collections import OrderedDict
+
+
+class LruCache(object):
+    """Bounded key-value store evicting least recently used entries.
+
+    Maintains hit, miss and eviction counters. Zero
+    or negative *maxSize* effectively disables caching.
+    """
+    def __init__(self, maxSize):
+        self._maxSize = maxSize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries.pop(key)
+
+        except KeyError:
+            self.misses += 1
+            return default
+
+        # move entry to the most recently used end
+        self._entries[key] = value
+
+        self.hits += 1
+
+        return value
+
+    def set(self, key, value):
+        if self._maxSize <= 0:
+            return
+
+        self._entries.pop(key, None)
+        self._entries[key] = value
+
+        while len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        self._entries.clear()
+
+    def getStats(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,102 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import os
+import sys
+import hashlib
+import tempfile
+
+try:
+    import cPickle as pickle
+
+except ImportError:
+    import pickle
+
+import snmpresponder
+from snmpresponder.error import SnmpResponderError
+
+SNAPSHOT_SUFFIX = '.compiled'
+
+# bump whenever pickled objects change their layout
+SNAPSHOT_FORMAT = 2
+
+
+def getSnapshotFile(cfgFile):
+    return cfgFile + SNAPSHOT_SUFFIX
+
+
+def getKey(cfgFile):
+    """Return the key identifying the contents of config file"""
+    try:
+        mtime = os.stat(cfgFile).st_mtime
+
+        with open(cfgFile, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+
+    except (IOError, OSError):
+        raise SnmpResponderError('cant read config file %s: %s' % (cfgFile, sys.exc_info()[1]))
+
+    return snmpresponder.__version__, SNAPSHOT_FORMAT, mtime, digest
+
+
+def load(cfgFile):
+    """Return (cfgTree, routingTables) snapshot of config file.
+
+    Return `None` if there is no snapshot or it has been made of some
+    other config file contents or by some other program version.
+    """
+    snapshotFile = getSnapshotFile(cfgFile)
+
+    try:
+        with open(snapshotFile, 'rb') as f:
+            if pickle.load(f) != getKey(cfgFile):
+                return
+
+            return pickle.load(f)
+
+    except (IOError, OSError):
+        return
+
+    except SnmpResponderError:
+        raise
+
+    except Exception:
+        raise SnmpResponderError('broken config snapshot %s: %s' % (snapshotFile, sys.exc_info()[1]))
+
+
+def save(cfgFile, cfgTree, routingTables, key=None):
+    """Save snapshot of parsed config file, return snapshot file name.
+
+    The `key` should be taken before config file parsing so that the
+    changes made to config file meanwhile invalidate the snapshot.
+    """
+    snapshotFile = getSnapshotFile(cfgFile)
+
+    if key is None:
+        key = getKey(cfgFile)
+
+    # lookup indices are computed lazily, make them part of the snapshot
+    cfgTree.buildIndex()
+
+    try:
+        fd, tmpFile = tempfile.mkstemp(dir=os.path.dirname(snapshotFile) or '.')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(key, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump((cfgTree, routingTables), f, pickle.HIGHEST_PROTOCOL)
+
+            # readers see either the old snapshot or the new one
+            getattr(os, 'replace', os.rename)(tmpFile, snapshotFile)
+
+        except Exception:
+            os.unlink(tmpFile)
+            raise
+
+    except (IOError, OSError):
+        raise SnmpResponderError('cant write config snapshot %s: %s' % (snapshotFile, sys.exc_info()[1]))
+
+    return snapshotFile
@@ -0,0 +1,475 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import re
+import sys
+import socket
+import binascii
+
+try:
+    import ipaddress
+
+except ImportError:
+    ipaddress = None
+
+from snmpresponder.error import SnmpResponderError
+
+# address pattern tail matching whatever port number follows
+ANY_ADDRESS_TAIL = re.compile(r'\.\*\??\$?$')
+
+# port pattern matching whatever port number
+ANY_PORT_PATTERN = re.compile(r'(?:\.\*|\\d[+*]|\[0-9\][+*])\??\$?$')
+
+# characters having special meaning in regular expressions
+META_CHARS = '.^$*+?{}[]\\|()'
+
+
+def isPortAgnostic(pattern):
+    """Tell if address pattern matches regardless of the port number.
+
+    The patterns are matched against "address:port" strings. Port
+    agnostic are the patterns having unconstrained port pattern past
+    top-level port separator, and literal address prefixes followed
+    by a wildcard. Patterns we can not be sure about are considered
+    telling ports apart.
+    """
+    separator = literalEnd = None
+    depth = 0
+    escaped = inClass = False
+
+    for idx, char in enumerate(pattern):
+        if escaped:
+            escaped = False
+
+            if char.isalnum() and literalEnd is None:
+                # e.g. \d, \w, \s
+                literalEnd = idx - 1
+
+        elif char == '\\':
+            escaped = True
+            continue
+
+        elif inClass:
+            inClass = char != ']'
+            continue
+
+        else:
+            if char in META_CHARS and literalEnd is None:
+                literalEnd = idx
+
+            if char == '[':
+                inClass = True
+
+            elif char == '(':
+                if pattern[idx + 1:idx + 2] == '?' and pattern[idx + 2:idx + 3] != ':':
+                    # lookarounds may peek at the port
+                    return False
+
+                depth += 1
+
+            elif char == ')':
+                depth -= 1
+
+            elif char == '|' and not depth:
+                return False
+
+        if char == ':' and not depth:
+            separator = idx
+
+    if separator is not None:
+        return bool(ANY_PORT_PATTERN.match(pattern, separator + 1))
+
+    if literalEnd is not None:
+        return bool(ANY_ADDRESS_TAIL.match(pattern, literalEnd))
+
+    return False
+
+
+class RegExpClassifier(object):
+    """Match strings against an ordered list of regular expressions.
+
+    Returns the value associated with the first pattern (in the order
+    of their addition) that matches the beginning of the string being
+    classified.
+
+    Instead of trying all patterns one by one, the patterns are filed
+    into a tree by their literal prefixes (if any) so that only the
+    patterns which could possibly match the string are considered.
+    The remaining candidates are joined into a few large alternations
+    evaluated by a single call into regular expressions engine.
+    """
+
+    # limit the number of patterns per alternation (older Pythons
+    # can not handle more than 100 groups in one expression, large
+    # alternations do not perform well either)
+    MAX_PATTERNS_PER_GROUP = 90
+
+    # back-references and conditionals refer to groups by number
+    UNSAFE_PATTERN = re.compile(r'\\[1-9]|\(\?\(')
+
+    # quantifiers applicable to the preceding character
+    QUANTIFIERS = '*+?{'
+
+    def __init__(self):
+        self._patterns = []
+        self._tree = None
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def add(self, value, pattern):
+        try:
+            re.compile(pattern)
+
+        except re.error:
+            raise SnmpResponderError('bad regular expression %s: %s' % (pattern, sys.exc_info()[1]))
+
+        self._patterns.append((value, pattern))
+        self._tree = None
+
+    def compile(self):
+        # tree node is [children-by-char, patterns-filed-here, compiled-groups]
+        tree = [{}, None, None]
+
+        for idx, (value, pattern) in enumerate(self._patterns):
+            node = tree
+
+            for char in self._getLiteralPrefix(pattern):
+                node = node[0].setdefault(char, [{}, None, None])
+
+            if node[1] is None:
+                node[1] = []
+
+            node[1].append((idx, value, pattern))
+
+        # each node needs to consider all patterns filed on the path
+        # from the root down to it, in the order of their addition
+
+        def walk(node, inherited):
+            if node[1] is not None:
+                inherited = sorted(inherited + node[1])
+                node[2] = self._compileGroups(
+                    [(value, pattern) for idx, value, pattern in inherited])
+
+            for child in node[0].values():
+                walk(child, inherited)
+
+        walk(tree, [])
+
+        self._tree = tree
+
+        return self
+
+    def _getLiteralPrefix(self, pattern):
+        if '|' in pattern:
+            return ''
+
+        prefix = ''
+        escaped = False
+
+        for idx, char in enumerate(pattern):
+            if escaped:
+                if char.isalnum():
+                    # e.g. \d, \w, \s, \A
+                    break
+
+                escaped = False
+
+            elif char == '\\':
+                escaped = True
+                continue
+
+            elif char in META_CHARS:
+                break
+
+            if pattern[idx + 1:idx + 2] and pattern[idx + 1] in self.QUANTIFIERS:
+                break
+
+            prefix += char
+
+        return prefix
+
+    def _isEmbeddable(self, pattern):
+        if self.UNSAFE_PATTERN.search(pattern):
+            return False
+
+        try:
+            # global flags are only allowed at the start of expression
+            re.compile('(?!)|(%s)' % pattern)
+
+        except Exception:
+            return False
+
+        return True
+
+    def _compileGroups(self, patterns):
+        groups = []
+        chunk = []
+
+        for value, pattern in patterns:
+            if self._isEmbeddable(pattern):
+                chunk.append((value, pattern))
+
+                if len(chunk) < self.MAX_PATTERNS_PER_GROUP:
+                    continue
+
+                groups.extend(self._compileChunk(chunk))
+
+            else:
+                groups.extend(self._compileChunk(chunk))
+                groups.append((re.compile(pattern), None, value))
+
+            chunk = []
+
+        groups.extend(self._compileChunk(chunk))
+
+        return groups
+
+    @staticmethod
+    def _compileChunk(chunk):
+        if not chunk:
+            return []
+
+        if len(chunk) == 1:
+            value, pattern = chunk[0]
+            return [(re.compile(pattern), None, value)]
+
+        alternatives = []
+        groupMap = {}
+        groupIdx = 1
+
+        for value, pattern in chunk:
+            alternatives.append('(%s)' % pattern)
+            groupMap[groupIdx] = value
+            groupIdx += 1 + re.compile(pattern).groups
+
+        try:
+            return [(re.compile('|'.join(alternatives)), groupMap, None)]
+
+        except Exception:
+            # e.g. same named groups in different patterns
+            return [(re.compile(pattern), None, value)
+                    for value, pattern in chunk]
+
+    def match(self, key):
+        if self._tree is None:
+            self.compile()
+
+        node = self._tree
+        groups = node[2]
+
+        for char in key:
+            try:
+                node = node[0][char]
+
+            except KeyError:
+                break
+
+            if node[2] is not None:
+                groups = node[2]
+
+        if not groups:
+            return
+
+        for regExp, groupMap, value in groups:
+            m = regExp.match(key)
+            if m:
+                if groupMap is None:
+                    return value
+
+                # outermost group of the matching alternative closes last
+                return groupMap[m.lastindex]
+
+
+class AddressPrefixClassifier(object):
+    """Match pairs of network addresses against IP prefixes.
+
+    Each value is associated with a pair of IPv4 or IPv6 prefixes,
+    one for the source (peer) address and the other for destination
+    (bind) address. Source address prefixes are kept in a binary tree
+    so that lookup cost depends on the address size rather than on the
+    number of prefixes.
+
+    The longest matching peer address prefix wins. Among the values
+    filed under the same peer prefix, the one with the longest bind
+    address prefix matching wins, then the earliest added.
+    """
+    ADDRESS_FAMILIES = {
+        4: (socket.AF_INET, 32),
+        6: (socket.AF_INET6, 128)
+    }
+
+    def __init__(self):
+        # tree node is [zero-child, one-child, entries]
+        self._trees = {4: [None, None, None],
+                       6: [None, None, None]}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _parseNetwork(prefix):
+        if ipaddress is None:
+            raise SnmpResponderError('IP prefix matching requires ipaddress module')
+
+        try:
+            network = ipaddress.ip_network(u'%s' % prefix, strict=False)
+
+        except ValueError:
+            raise SnmpResponderError('bad IP prefix %s: %s' % (prefix, sys.exc_info()[1]))
+
+        return network.version, int(network.network_address), network.prefixlen
+
+    def _parseAddress(self, address):
+        # drop IPv6 zone index, if any
+        address = str(address).split('%', 1)[0]
+
+        for version in 4, 6:
+            family, width = self.ADDRESS_FAMILIES[version]
+
+            try:
+                return version, int(binascii.hexlify(socket.inet_pton(family, address)), 16)
+
+            except (socket.error, ValueError):
+                continue
+
+        return None, None
+
+    def add(self, value, peerPrefix, bindPrefix):
+        version, address, prefixLength = self._parseNetwork(peerPrefix)
+        bindNetwork = self._parseNetwork(bindPrefix)
+
+        node = self._trees[version]
+
+        width = self.ADDRESS_FAMILIES[version][1]
+
+        for shift in range(width - 1, width - 1 - prefixLength, -1):
+            bit = (address >> shift) & 1
+
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+
+            node = node[bit]
+
+        if node[2] is None:
+            node[2] = []
+
+        node[2].append((bindNetwork, value))
+
+        # stable sort keeps the order of addition for same-length prefixes
+        node[2].sort(key=lambda x: -x[0][2])
+
+        self._count += 1
+
+    def match(self, peerAddress, bindAddress):
+        version, address = self._parseAddress(peerAddress)
+        if version is None:
+            return
+
+        node = self._trees[version]
+
+        candidates = node[2] and [node[2]] or []
+
+        for shift in range(self.ADDRESS_FAMILIES[version][1] - 1, -1, -1):
+            node = node[(address >> shift) & 1]
+            if node is None:
+                break
+
+            if node[2]:
+                candidates.append(node[2])
+
+        if not candidates:
+            return
+
+        version, address = self._parseAddress(bindAddress)
+        if version is None:
+            return
+
+        width = self.ADDRESS_FAMILIES[version][1]
+
+        while candidates:
+            for (bindVersion, bindNetwork, prefixLength), value in candidates.pop():
+                if (bindVersion == version and
+                        address >> (width - prefixLength) == bindNetwork >> (width - prefixLength)):
+                    return value
+
+
+class OidPrefixClassifier(object):
+    """Match SNMP PDU type and var-bind OIDs against OID prefixes.
+
+    Each value is associated with a set of PDU types and a set of OID
+    prefixes, either set may be empty meaning any PDU type or any OID.
+    SNMP PDU matches a value if PDU type is in the set and every
+    var-bind OID falls under at least one of the OID prefixes.
+
+    OID prefixes are kept in a tree keyed by sub-identifiers, OIDs
+    are never turned into strings. Of all matching values, the first
+    added wins.
+    """
+    def __init__(self):
+        # tree node is [children-by-sub-id, values-bit-mask]
+        self._tree = [{}, 0]
+        self._pduTypeMasks = {}
+        self._anyPduTypeMask = 0
+        self._anyOidMask = 0
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value, pduTypes=(), oidPrefixes=()):
+        mask = 1 << len(self._values)
+
+        self._values.append(value)
+
+        if pduTypes:
+            for pduType in pduTypes:
+                self._pduTypeMasks[pduType] = self._pduTypeMasks.get(pduType, 0) | mask
+
+        else:
+            self._anyPduTypeMask |= mask
+
+        if oidPrefixes:
+            for oidPrefix in oidPrefixes:
+                node = self._tree
+
+                for subId in oidPrefix:
+                    node = node[0].setdefault(subId, [{}, 0])
+
+                node[1] |= mask
+
+        else:
+            self._anyOidMask |= mask
+
+    def getOidMask(self, oid):
+        """Return bit mask of values having OID prefixes covering `oid`"""
+        node = self._tree
+        mask = self._anyOidMask | node[1]
+
+        for subId in oid:
+            try:
+                node = node[0][subId]
+
+            except KeyError:
+                break
+
+            mask |= node[1]
+
+        return mask
+
+    def match(self, pduType, oids):
+        mask = self._pduTypeMasks.get(pduType, 0) | self._anyPduTypeMask
+
+        for oid in oids:
+            if not mask:
+                return
+
+            mask &= self.getOidMask(oid)
+
+        if mask:
+            # lowest bit set identifies the first added value
+            return self._values[(mask & -mask).bit_length() - 1]
@@ -0,0 +1,62 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import threading
+
+
+class Coalescer(object):
+    """Share in-flight asynchronous calls among concurrent callers.
+
+    Meant for asynchronous MIB objects: while a backend call for a key
+    is in flight, subsequent callers asking for the same key get the
+    future of that call rather than starting another one.
+
+    Futures can be anything having `add_done_callback()` method e.g.
+    `concurrent.futures.Future` or `asyncio.Future`.
+    """
+    def __init__(self):
+        # futures may complete in other threads
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def submit(self, key, startFun, *args, **kwargs):
+        """Return future of the call for `key`.
+
+        Unless a call for `key` is in flight, `startFun(*args, **kwargs)`
+        is called to start one, it must return a future.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            future = startFun(*args, **kwargs)
+
+            self._inflight[key] = future
+
+            self.started += 1
+
+        future.add_done_callback(lambda x: self._forget(key, x))
+
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def getStats(self):
+        return {
+            'in-flight': len(self._inflight),
+            'started': self.started,
+            'coalesced': self.coalesced
+        }
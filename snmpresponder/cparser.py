@@ -15,29 +15,37 @@ SYMBOL_SECTION_BEGIN = '{'
 SYMBOL_SECTION_END = '}'
 SYMBOL_WORD = ''
 
+TOKEN_REGEXP = re.compile(r'(?:[^\s,"]|"(?:\\.|[^"])*")+')
+
 
 class Scanner(object):
     def __init__(self):
-        self.lines = None
         self.tokens = []
         self.index = 0
         self.length = 0
 
     def load(self, filename):
         try:
-            self.lines = open(filename).readlines()
-        except OSError:
+            with open(filename) as f:
+                self.tokens = list(self.scan(f))
+
+        except (IOError, OSError):
             raise error.SnmpResponderError('cant open config file %s: %s' % (filename, sys.exc_info()[1]))
 
-        self.tokens = []
+        self.index = 0
+        self.length = len(self.tokens)
+
+        return self
 
-        while self.lines:
-            line = self.lines.pop(0)
+    @staticmethod
+    def scan(lines):
+        """Yield (token, symbol) pairs read from lines one by one"""
+        for line in lines:
 
             if line and line[0] == '#':
                 continue
 
-            tokens = re.findall(r'(?:[^\s,"]|"(?:\\.|[^"])*")+', line)
+            tokens = TOKEN_REGEXP.findall(line)
             for i in range(len(tokens)):
                 if tokens[i] and tokens[i][0] == '"' and tokens[i][-1] == '"':
                     tokens[i] = tokens[i][1:-1]
@@ -60,14 +68,8 @@ class Scanner(object):
                 else:
                     symbol = SYMBOL_WORD
 
-                # Attach read tokens to list of tokens
-                self.tokens.append((token, symbol))
-
-        self.index = 0
-        self.length = len(self.tokens)
+                yield token, symbol
 
-        return self
-        
     def get_token(self):
         if self.index >= self.length:
             raise error.EofError()
@@ -274,11 +276,48 @@ class Parser(object):
 class Config(object):
     def __init__(self):
         self.objects = {}
-    
+        self._scopes = None
+        self._paths = None
+
     def load(self, filename):
         self.objects = Parser(Scanner().load(filename)).parse()
+        self._scopes = self._paths = None
         return self
 
+    def buildIndex(self):
+        """Resolve attributes of every scope (inheriting from enclosing
+           scopes) and paths to every attribute in one tree walk
+        """
+        # scope path -> {attribute: values} including inherited ones
+        self._scopes = scopes = {}
+        # attribute -> paths to scopes defining it
+        self._paths = paths = {}
+
+        stack = [(self.objects, (), {}, True)]
+
+        while stack:
+            obj, nodes, attrs, reachable = stack.pop()
+
+            nodes += obj['_name'],
+
+            ownAttrs = [x for x in obj if x not in ('_name', '_children')]
+
+            for attr in ownAttrs:
+                paths.setdefault(attr, []).append(nodes)
+
+            # only the first of same-named sibling scopes is ever looked up
+            reachable = reachable and nodes not in scopes
+
+            if reachable:
+                attrs = dict(attrs)
+                for attr in ownAttrs:
+                    attrs[attr] = obj[attr]
+
+                scopes[nodes] = attrs
+
+            for child in reversed(obj['_children']):
+                stack.append((child, nodes, attrs, reachable))
+
     def traverse(self, objects, nodes):
         """Return the leaf object resulted by traversing config
            objects tree by nodes
@@ -298,6 +337,12 @@ class Config(object):
                     return r
 
     def getPathsToAttr(self, attr, objects=None, nodes=None, paths=None):
+        if objects is None and nodes is None and paths is None:
+            if self._paths is None:
+                self.buildIndex()
+
+            return list(self._paths.get(attr, ()))
+
         if objects is None:
             objects = self.objects
         if nodes is None:
@@ -312,10 +357,17 @@ class Config(object):
         return paths
 
     def getAttrValue(self, attr, *nodes, **kwargs):
+        if self._scopes is None:
+            self.buildIndex()
+
+        # the innermost existing scope along the path
         scope = nodes
-        while scope:
-            obj = self.traverse([self.objects], scope)
-            if obj and attr in obj:
+        while scope and scope not in self._scopes:
+            scope = scope[:-1]
+
+        if scope:
+            obj = self._scopes[scope]
+            if attr in obj:
                 expect = kwargs.get('expect')
 
                 if 'vector' in kwargs:
@@ -338,8 +390,6 @@ class Config(object):
                     else:
                         return ''
 
-            scope = scope[:-1]
-
         if 'default' in kwargs:
             return kwargs['default']
         else:
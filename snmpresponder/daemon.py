@@ -7,17 +7,23 @@
 # UNIX-specific process daemonization tools
 import sys
 from snmpresponder import error
+from snmpresponder import log
 
 if sys.platform[:3] == 'win':
     def daemonize(pidfile):
         raise error.SnmpResponderError('Windows is not inhabited with daemons!')
 
+    def runWorkers(count, workerFun):
+        raise error.SnmpResponderError('Windows does not fork worker processes!')
+
     def dropPrivileges(uname, gname):
         return
 else:
     import os
     import pwd
     import grp
+    import time
+    import errno
     import atexit
     import signal
     import tempfile
@@ -50,7 +56,8 @@ else:
 
         def signal_cb(s, f):
             raise KeyboardInterrupt
-        for s in signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT:
+        # SIGHUP is left to the daemon to reload its configuration
+        for s in signal.SIGTERM, signal.SIGINT, signal.SIGQUIT:
             signal.signal(s, signal_cb)
 
         # write pidfile
@@ -83,6 +90,108 @@ else:
         os.dup2(so.fileno(), sys.stdout.fileno())
         os.dup2(se.fileno(), sys.stderr.fileno())
 
+    # do not restart workers dying sooner than that more often than that
+    WORKER_RESTART_DELAY = 1
+
+    def runWorkers(count, workerFun):
+        """Run `count` forked worker processes until interrupted.
+
+        Each worker process calls `workerFun(workerIdx)` and exits with
+        its return code, workers that exit are forked again.
+        """
+        workers = {}
+
+        def spawn(workerIdx):
+            try:
+                pid = os.fork()
+
+            except OSError:
+                raise error.SnmpResponderError('fork() failed: %s' % sys.exc_info()[1])
+
+            if pid == 0:
+                rc = 1
+
+                # worker sets up its own reload signals handlers
+                for s in signal.SIGHUP, signal.SIGUSR1:
+                    signal.signal(s, signal.SIG_IGN)
+
+                try:
+                    rc = workerFun(workerIdx) or 0
+
+                finally:
+                    # skip atexit handlers (e.g. pidfile removal) of the master
+                    os._exit(rc)
+
+            workers[pid] = workerIdx, time.time()
+
+            log.info('started worker #%s, PID %s' % (workerIdx, pid))
+
+        def signal_cb(s, f):
+            raise KeyboardInterrupt
+
+        # make sure master terminates its workers when told to go away
+        for s in signal.SIGTERM, signal.SIGINT:
+            signal.signal(s, signal_cb)
+
+        def forward_cb(s, f):
+            for pid in list(workers):
+                try:
+                    os.kill(pid, s)
+
+                except OSError:
+                    pass
+
+        # let workers reload their configuration and MIB trees
+        for s in signal.SIGHUP, signal.SIGUSR1:
+            signal.signal(s, forward_cb)
+
+        try:
+            for workerIdx in range(count):
+                spawn(workerIdx)
+
+            while True:
+                try:
+                    pid, status = os.wait()
+
+                except OSError:
+                    if sys.exc_info()[1].errno == errno.EINTR:
+                        continue
+
+                    raise
+
+                if pid not in workers:
+                    continue
+
+                workerIdx, startedAt = workers.pop(pid)
+
+                if os.WIFSIGNALED(status):
+                    status = 'signal %s' % os.WTERMSIG(status)
+
+                else:
+                    status = 'code %s' % os.WEXITSTATUS(status)
+
+                log.error('worker #%s, PID %s exited with %s, restarting' % (workerIdx, pid, status))
+
+                if time.time() - startedAt < WORKER_RESTART_DELAY:
+                    time.sleep(WORKER_RESTART_DELAY)
+
+                spawn(workerIdx)
+
+        finally:
+            for pid in workers:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+
+                except OSError:
+                    pass
+
+            for pid in workers:
+                try:
+                    os.waitpid(pid, 0)
+
+                except OSError:
+                    pass
+
 
     class PrivilegesOf(object):
 
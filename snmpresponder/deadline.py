@@ -0,0 +1,91 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import time
+import heapq
+import threading
+
+
+class DeadlineTracker(object):
+    """Give up on requests not completed in time.
+
+    Each tracked request has an expiration function. Once the deadline
+    of the request passes, `expire()` (periodically called from main
+    loop) calls it with the arguments given to `add()`. Exactly one of
+    `expire()` and `remove()` wins, the request completing after its
+    deadline should be discarded.
+
+    Deadlines are kept in a heap, removed requests are dropped from it
+    lazily, once their deadlines come up.
+
+    Deadlines are points in time of the *clock* (`time.time()` by
+    default), the same clock MIB objects see request deadlines in.
+    """
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        # completions may come from other threads
+        self._lock = threading.Lock()
+        # token -> (expireFun, args)
+        self._pending = {}
+        # (deadline, token) of requests, possibly already removed
+        self._deadlines = []
+        self._token = 0
+        self.expired = 0
+        self.discarded = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, deadline, expireFun, *args):
+        with self._lock:
+            self._token += 1
+            self._pending[self._token] = expireFun, args
+            heapq.heappush(self._deadlines, (deadline, self._token))
+            return self._token
+
+    def remove(self, token):
+        """Stop tracking request, return False if it has already expired"""
+        with self._lock:
+            if self._pending.pop(token, None) is None:
+                self.discarded += 1
+                return False
+
+            # do not let removed requests pile up in the heap
+            if len(self._deadlines) > 2 * len(self._pending) + self.COMPACT_THRESHOLD:
+                self._deadlines = [(deadline, token) for deadline, token in self._deadlines
+                                   if token in self._pending]
+                heapq.heapify(self._deadlines)
+
+        return True
+
+    def expire(self, timeNow=None):
+        # timer tick time is of no use, I/O engines tick on different
+        # clocks (asyncio passes monotonic loop time)
+        now = self._clock()
+
+        expired = []
+
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                deadline, token = heapq.heappop(self._deadlines)
+
+                pending = self._pending.pop(token, None)
+                if pending is not None:
+                    expired.append(pending)
+
+            self.expired += len(expired)
+
+        for expireFun, args in expired:
+            expireFun(*args)
+
+    def getStats(self):
+        return {
+            'pending': len(self._pending),
+            'expired': self.expired,
+            'discarded': self.discarded
+        }
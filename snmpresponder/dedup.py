@@ -0,0 +1,84 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import time
+
+from snmpresponder import cache
+
+
+class RequestDeduplicator(object):
+    """Recognize retransmitted SNMP requests.
+
+    Requests are identified by the caller-supplied keys. While a request
+    is being processed, its retransmissions are queued up as waiters to
+    be answered along with the original request. Once responded, the
+    response is kept for *window* seconds to answer retransmissions
+    arriving late.
+
+    Responses are kept as var-binds rather than encoded messages because
+    each SNMPv3 retransmission carries its own msgID.
+    """
+    def __init__(self, window, maxSize=4096):
+        self._window = window
+        # key -> list of waiters
+        self._inflight = {}
+        # original request stateReference -> key
+        self._owners = {}
+        self._responses = cache.LruCache(maxSize)
+        self.attached = 0
+        self.replayed = 0
+
+    def getResponse(self, key):
+        response = self._responses.get(key)
+        if response is None:
+            return
+
+        expiresAt, response = response
+
+        if expiresAt < time.time():
+            self._responses.pop(key)
+            return
+
+        self.replayed += 1
+
+        return response
+
+    def attach(self, key, waiter):
+        """Queue up `waiter` if a request with the same key is in flight"""
+        try:
+            self._inflight[key].append(waiter)
+
+        except KeyError:
+            return False
+
+        self.attached += 1
+
+        return True
+
+    def start(self, key, stateReference):
+        self._inflight[key] = []
+        self._owners[stateReference] = key
+
+    def finish(self, stateReference, response=None):
+        """Return waiters of the original request, remember its response"""
+        try:
+            key = self._owners.pop(stateReference)
+
+        except KeyError:
+            return ()
+
+        if response is not None:
+            self._responses.set(key, (time.time() + self._window, response))
+
+        return self._inflight.pop(key, ())
+
+    def getStats(self):
+        return {
+            'in-flight': len(self._inflight),
+            'responses': len(self._responses),
+            'attached': self.attached,
+            'replayed': self.replayed
+        }
@@ -13,9 +13,24 @@ try:
     from pysnmp.carrier.asyncore.dgram import udp6
 except ImportError:
     udp6 = None
+try:
+    from pysnmp.carrier.asyncore.dgram import unix
+except ImportError:
+    unix = None
+
+
+def isLocalDomain(transportDomain):
+    return bool(unix and transportDomain[:len(unix.DOMAIN_NAME)] == unix.DOMAIN_NAME)
 
 
 def parseTransportAddress(transportDomain, transportAddress, transportOptions, defaultPort=0):
+    if isLocalDomain(transportDomain):
+        # UNIX domain socket path
+        if not transportAddress.startswith('/'):
+            raise SnmpResponderError('bad UNIX socket path specification')
+
+        return transportAddress, None
+
     if (('transparent-proxy' in transportOptions or
          'virtual-interface' in transportOptions) and '$' in transportAddress):
         addrMacro = transportAddress
@@ -47,3 +62,21 @@ def parseTransportAddress(transportDomain, transportAddress, transportOptions, d
             raise SnmpResponderError('bad port specification')
 
     return (h, p), addrMacro
+
+
+def splitTransportAddress(transportAddress):
+    """Return host and port parts of transport address.
+
+    UNIX domain socket addresses are just paths, port is reported as 0.
+    """
+    if isinstance(transportAddress, tuple):
+        return transportAddress[0], transportAddress[1]
+
+    return str(transportAddress or ''), 0
+
+
+def formatTransportAddress(transportAddress):
+    if isinstance(transportAddress, tuple):
+        return '[%s]:%s' % (transportAddress[0], transportAddress[1])
+
+    return str(transportAddress)
@@ -11,3 +11,7 @@ class SnmpResponderError(Exception):
 
 class EofError(SnmpResponderError):
     pass
+
+
+class CircuitOpenError(SnmpResponderError):
+    pass
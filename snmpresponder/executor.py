@@ -0,0 +1,148 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import os
+import time
+import threading
+
+try:
+    from concurrent import futures
+
+except ImportError:
+    futures = None
+
+from snmpresponder.error import SnmpResponderError
+
+
+class BoundedExecutor(object):
+    """Thread pool shared by all MIB implementations.
+
+    Limits the number of threads and, optionally, the number of calls
+    waiting for a thread. Calls beyond the queue limit are rejected
+    rather than queued up, the returned future fails right away.
+    """
+    def __init__(self, maxWorkers, maxQueue=0):
+        if futures is None:
+            raise SnmpResponderError('concurrent.futures module is not available')
+
+        # threads are started on demand i.e. after daemonization
+        self._executor = futures.ThreadPoolExecutor(max_workers=maxWorkers)
+        self._maxQueue = maxQueue
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.maxWait = 0
+        self.totalWait = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule `fn(*args, **kwargs)` call, return its future"""
+        with self._lock:
+            if self._maxQueue and self.queued >= self._maxQueue:
+                self.rejected += 1
+
+                future = futures.Future()
+                future.set_exception(SnmpResponderError('executor queue is full'))
+
+                return future
+
+            self.queued += 1
+            self.submitted += 1
+
+        submittedAt = time.time()
+
+        def _run():
+            wait = time.time() - submittedAt
+
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.totalWait += wait
+                self.maxWait = max(self.maxWait, wait)
+
+            try:
+                return fn(*args, **kwargs)
+
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        return self._executor.submit(_run)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def getStats(self):
+        started = self.submitted - self.queued
+
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'max-wait': '%.3f' % self.maxWait,
+            'avg-wait': '%.3f' % (started and self.totalWait / started or 0)
+        }
+
+
+class ProcessPool(object):
+    """Process pool for CPU-bound MIB object computations.
+
+    Python threads can not compute in parallel, CPU-bound calls run in
+    a thread pool stall the main loop. Here calls (and their results)
+    must be picklable.
+
+    Processes are started on first submit. If the pool has been started
+    in a process which has forked since then (e.g. daemonized or spawned
+    worker processes), the child starts its own pool.
+    """
+    def __init__(self, maxWorkers=0):
+        if futures is None:
+            raise SnmpResponderError('concurrent.futures module is not available')
+
+        self._maxWorkers = maxWorkers or None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.submitted = 0
+        self.failed = 0
+
+    def _getExecutor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # pool inherited from parent process is not usable
+                self._executor = futures.ProcessPoolExecutor(max_workers=self._maxWorkers)
+                self._pid = os.getpid()
+
+            return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule `fn(*args, **kwargs)` call in a child process, return its future"""
+        future = self._getExecutor().submit(fn, *args, **kwargs)
+
+        self.submitted += 1
+
+        future.add_done_callback(self._done)
+
+        return future
+
+    def _done(self, future):
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=wait)
+
+            self._executor = None
+
+    def getStats(self):
+        return {
+            'submitted': self.submitted,
+            'failed': self.failed
+        }
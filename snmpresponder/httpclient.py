@@ -0,0 +1,193 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+import time
+import json
+import socket
+import threading
+
+try:
+    from http import client as http_client
+    from urllib.parse import urlsplit
+
+except ImportError:
+    import httplib as http_client
+    from urlparse import urlsplit
+
+from snmpresponder.error import SnmpResponderError
+
+# errors suggesting that server has closed idle keep-alive connection
+STALE_CONNECTION_ERRORS = (http_client.BadStatusLine, socket.error)
+
+
+class HttpError(SnmpResponderError):
+    pass
+
+
+class HostPool(object):
+    """Keep-alive connections to one host, no more than `maxSize`"""
+    def __init__(self, scheme, netloc, maxSize, timeout):
+        self._connectionClass = (
+            scheme == 'https' and http_client.HTTPSConnection or http_client.HTTPConnection)
+        self._netloc = netloc
+        self._maxSize = maxSize
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []
+        self._count = 0
+        self.created = 0
+
+    def acquire(self):
+        """Return (connection, reused) pair, wait for a free connection"""
+        deadline = time.time() + self._timeout
+
+        with self._cond:
+            while not self._idle and self._count >= self._maxSize:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    raise HttpError('no free connection to %s' % self._netloc)
+
+                self._cond.wait(timeout)
+
+            if self._idle:
+                return self._idle.pop(), True
+
+            self._count += 1
+            self.created += 1
+
+        return self._connectionClass(self._netloc, timeout=self._timeout), False
+
+    def release(self, conn, reusable=True):
+        with self._cond:
+            if reusable:
+                self._idle.append(conn)
+
+            else:
+                conn.close()
+                self._count -= 1
+
+            self._cond.notify()
+
+    def __len__(self):
+        return self._count
+
+
+class HttpClient(object):
+    """HTTP client keeping connections to REST API servers alive.
+
+    Meant to be shared by MIB implementations. At most *maxConnections*
+    connections are kept per host. The `request()` and `getJson()`
+    methods block, the `submitJson()` method runs `getJson()` in the
+    *executor* so that neither network I/O nor JSON decoding happens
+    in the main loop.
+    """
+    def __init__(self, executor=None, maxConnections=4, timeout=10):
+        self._executor = executor
+        self._maxConnections = maxConnections
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._pools = {}
+        self.requests = 0
+        self.reused = 0
+        self.failures = 0
+
+    def _getPool(self, scheme, netloc):
+        with self._lock:
+            try:
+                return self._pools[(scheme, netloc)]
+
+            except KeyError:
+                pool = HostPool(scheme, netloc, self._maxConnections, self._timeout)
+                self._pools[(scheme, netloc)] = pool
+                return pool
+
+    def request(self, method, url, body=None, headers=None):
+        """Return (status, headers, body) of HTTP response"""
+        scheme, netloc, path, query, _ = urlsplit(url)
+
+        if scheme not in ('http', 'https'):
+            raise HttpError('unsupported URL %s' % url)
+
+        if query:
+            path += '?' + query
+
+        pool = self._getPool(scheme, netloc)
+
+        with self._lock:
+            self.requests += 1
+
+        while True:
+            conn, reused = pool.acquire()
+
+            try:
+                conn.request(method, path or '/', body, headers or {})
+
+                rsp = conn.getresponse()
+
+                data = rsp.read()
+
+            except STALE_CONNECTION_ERRORS:
+                pool.release(conn, reusable=False)
+
+                # idle connection might have been closed by server
+                if (reused and method in ('GET', 'HEAD') and
+                        not isinstance(sys.exc_info()[1], socket.timeout)):
+                    continue
+
+                with self._lock:
+                    self.failures += 1
+
+                raise HttpError('%s %s failed: %s' % (method, url, sys.exc_info()[1]))
+
+            except Exception:
+                pool.release(conn, reusable=False)
+
+                with self._lock:
+                    self.failures += 1
+
+                raise
+
+            pool.release(conn, reusable=not rsp.will_close)
+
+            if reused:
+                with self._lock:
+                    self.reused += 1
+
+            return rsp.status, dict(rsp.getheaders()), data
+
+    def getJson(self, url, headers=None):
+        """Return decoded JSON document fetched by HTTP GET"""
+        headers = dict(headers or {}, Accept='application/json')
+
+        status, _, data = self.request('GET', url, headers=headers)
+
+        if status != 200:
+            with self._lock:
+                self.failures += 1
+
+            raise HttpError('GET %s failed with HTTP status %s' % (url, status))
+
+        return json.loads(data.decode('utf-8'))
+
+    def submitJson(self, url, headers=None):
+        """Run `getJson()` in executor, return its future"""
+        if self._executor is None:
+            raise HttpError('no executor to run HTTP request in')
+
+        return self._executor.submit(self.getJson, url, headers)
+
+    def getStats(self):
+        pools = list(self._pools.values())
+
+        return {
+            'hosts': len(pools),
+            'connections': sum([len(x) for x in pools]),
+            'created': sum([x.created for x in pools]),
+            'requests': self.requests,
+            'reused': self.reused,
+            'failures': self.failures
+        }
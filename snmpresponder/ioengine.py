@@ -0,0 +1,280 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import os
+import sys
+import stat
+import socket
+import errno
+
+from pysnmp.error import PySnmpError
+from pysnmp.carrier import error as carrier_error
+from pysnmp.carrier.asyncore.dgram import udp
+try:
+    from pysnmp.carrier.asyncore.dgram import udp6
+except ImportError:
+    udp6 = None
+try:
+    from pysnmp.carrier.asyncore.dgram import unix
+except ImportError:
+    unix = None
+from pysnmp.carrier.asyncore.dispatch import AsyncoreDispatcher
+
+try:
+    import asyncio
+    from pysnmp.carrier.asyncio.dgram import udp as asyncio_udp
+    from pysnmp.carrier.asyncio.dispatch import AsyncioDispatcher
+
+except (ImportError, SyntaxError):
+    asyncio = None
+
+try:
+    from pysnmp.carrier.asyncio.dgram import udp6 as asyncio_udp6
+
+except (ImportError, SyntaxError):
+    asyncio_udp6 = None
+
+from snmpresponder.error import SnmpResponderError
+
+
+# socket errors not worth reporting, True if socket is no longer usable
+SOCK_ERRORS = {
+    errno.ESHUTDOWN: True,
+    errno.ENOTCONN: True,
+    errno.ECONNRESET: False,
+    errno.ECONNREFUSED: False
+}
+
+
+class BatchDgramMixIn(object):
+    """Serve up to `batchSize` datagrams per socket readiness event.
+
+    Stock asyncore datagram transports receive or send just one
+    datagram per `select()` call, under load most of the time is
+    spent polling sockets rather than serving requests.
+
+    Datagrams are still received and sent via `_recvfrom()` and
+    `_sendto()` of the transport so that packet info options keep
+    working.
+    """
+    batchSize = 1
+
+    def handle_read(self):
+        for _ in range(self.batchSize):
+            try:
+                incomingMessage, transportAddress = self._recvfrom(self.socket, 65535)
+
+            except socket.error:
+                err = sys.exc_info()[1].args[0]
+
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    # socket drained
+                    return
+
+                if err in SOCK_ERRORS:
+                    SOCK_ERRORS[err] and self.handle_close()
+                    return
+
+                raise carrier_error.CarrierError('recvfrom() failed: %s' % (sys.exc_info()[1],))
+
+            if not incomingMessage:
+                self.handle_close()
+                return
+
+            self._cbFun(self, self.normalizeAddress(transportAddress), incomingMessage)
+
+    def handle_write(self):
+        for _ in range(self.batchSize):
+            if not self.writable():
+                return
+
+            super(BatchDgramMixIn, self).handle_write()
+
+
+class BatchUdpTransport(BatchDgramMixIn, udp.UdpTransport):
+    pass
+
+
+if udp6:
+    class BatchUdp6Transport(BatchDgramMixIn, udp6.Udp6Transport):
+        pass
+
+if unix:
+    class BatchUnixTransport(BatchDgramMixIn, unix.UnixTransport):
+        pass
+
+
+class AsyncoreEngine(object):
+    """Run SNMP engines on top of asyncore-based transports"""
+    TRANSPORT_OPTIONS = ('transparent-proxy', 'virtual-interface', 'batch-io')
+
+    def __init__(self):
+        self.transportDispatcher = AsyncoreDispatcher()
+        self.transportDispatcher.setSocketMap()  # use global asyncore socket map
+
+    def getTransport(self, transportDomain, batchSize=0):
+        if transportDomain[:len(udp.DOMAIN_NAME)] == udp.DOMAIN_NAME:
+            transport = batchSize and BatchUdpTransport() or udp.UdpTransport()
+
+        elif udp6 and transportDomain[:len(udp6.DOMAIN_NAME)] == udp6.DOMAIN_NAME:
+            transport = batchSize and BatchUdp6Transport() or udp6.Udp6Transport()
+
+        elif unix and transportDomain[:len(unix.DOMAIN_NAME)] == unix.DOMAIN_NAME:
+            transport = batchSize and BatchUnixTransport() or unix.UnixTransport()
+
+        else:
+            raise SnmpResponderError('unsupported transport domain %s' % (transportDomain,))
+
+        if batchSize:
+            transport.batchSize = batchSize
+
+        return transport
+
+    def openServerMode(self, transport, bindAddr, reusePort=False, socketMode=None):
+        if transport.socket.family == getattr(socket, 'AF_UNIX', None):
+            return openUnixServerMode(transport, bindAddr, socketMode)
+
+        if reusePort:
+            setReusePort(transport.socket)
+
+        return transport.openServerMode(bindAddr)
+
+
+class AsyncioEngine(object):
+    """Run SNMP engines on top of asyncio-based transports.
+
+    Managed objects can schedule their coroutines on the very same
+    event loop (as returned by `asyncio.get_event_loop()`).
+    """
+    TRANSPORT_OPTIONS = ()
+
+    def __init__(self):
+        if asyncio is None:
+            raise SnmpResponderError('asyncio I/O engine is not available')
+
+        self.loop = asyncio.get_event_loop()
+        self.transportDispatcher = AsyncioDispatcher(loop=self.loop)
+
+    def getTransport(self, transportDomain, batchSize=0):
+        if transportDomain[:len(asyncio_udp.DOMAIN_NAME)] == asyncio_udp.DOMAIN_NAME:
+            return asyncio_udp.UdpTransport(loop=self.loop)
+
+        if (asyncio_udp6 and
+                transportDomain[:len(asyncio_udp6.DOMAIN_NAME)] == asyncio_udp6.DOMAIN_NAME):
+            return asyncio_udp6.Udp6Transport(loop=self.loop)
+
+        raise SnmpResponderError('unsupported transport domain %s' % (transportDomain,))
+
+    def openServerMode(self, transport, bindAddr, reusePort=False, socketMode=None):
+        # asyncio binds sockets lazily, once the loop is running, but
+        # privileged ports need to be bound before we drop privileges.
+        # So we bind the socket ourselves and hand it over to asyncio
+        # along with the pysnmp transport which is asyncio datagram
+        # protocol on its own.
+        sock = socket.socket(transport.sockFamily, socket.SOCK_DGRAM)
+
+        try:
+            if reusePort:
+                setReusePort(sock)
+
+            sock.bind(bindAddr)
+
+            self.loop.run_until_complete(
+                self.loop.create_datagram_endpoint(lambda: transport, sock=sock)
+            )
+
+        except (socket.error, OSError):
+            sock.close()
+            raise PySnmpError('bind() for %s failed: %s' % (bindAddr, sys.exc_info()[1]))
+
+        except SnmpResponderError:
+            sock.close()
+            raise
+
+        return transport
+
+
+IO_ENGINES = {
+    'asyncore': AsyncoreEngine,
+    'asyncio': AsyncioEngine
+}
+
+
+def getIoEngine(name):
+    try:
+        return IO_ENGINES[name]()
+
+    except KeyError:
+        raise SnmpResponderError('unknown I/O engine %s' % name)
+
+
+def openUnixServerMode(transport, path, socketMode=None):
+    # socket file left behind by previous run would fail bind(), but
+    # the one some running process listens on must be left alone
+    try:
+        isSocket = stat.S_ISSOCK(os.stat(path).st_mode)
+
+    except OSError:
+        isSocket = False
+
+    if isSocket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+        try:
+            sock.connect(path)
+
+        except socket.error:
+            err = sys.exc_info()[1].args[0]
+
+            # nobody listens on the socket
+            if err == errno.ECONNREFUSED:
+                try:
+                    os.remove(path)
+
+                except OSError:
+                    pass
+
+            elif err != errno.ENOENT:
+                raise PySnmpError('socket %s is not usable: %s' % (path, sys.exc_info()[1]))
+
+        else:
+            raise PySnmpError('socket %s is in use by another process' % path)
+
+        finally:
+            sock.close()
+
+    t = transport.openServerMode(path)
+
+    if socketMode is not None:
+        try:
+            os.chmod(path, socketMode)
+
+        except OSError:
+            raise PySnmpError('chmod() for %s failed: %s' % (path, sys.exc_info()[1]))
+
+    return t
+
+
+def setReusePort(sock):
+    """Let a few processes bind the same address, kernel would
+    distribute incoming datagrams among them"""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+    except (AttributeError, socket.error):
+        raise SnmpResponderError('SO_REUSEPORT socket option not supported: %s' % sys.exc_info()[1])
+
+
+def getLocalAddress(transportAddress, default=None):
+    """Return local address datagram has been received at.
+
+    Not all transports report it along with peer address.
+    """
+    try:
+        return transportAddress.getLocalAddress() or default
+
+    except AttributeError:
+        return default
@@ -7,9 +7,11 @@
 
 
 def expandMacro(option, context):
+    if not option or '${' not in option:
+        return option
     for k in context:
         pat = '${%s}' % k
-        if option and '${' in option:
+        if '${' in option:
             option = option.replace(pat, str(context[k]))
     return option
 
@@ -0,0 +1,106 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+import time
+
+from pysnmp.proto import rfc1902, rfc1905
+
+from snmpresponder.error import SnmpResponderError
+from snmpresponder import cache
+
+EXCEPTION_TAGSETS = (
+    rfc1905.NoSuchObject.tagSet,
+    rfc1905.NoSuchInstance.tagSet,
+    rfc1905.EndOfMibView.tagSet
+)
+
+
+class MibTreeCache(object):
+    """Remember var-binds read from MIB tree for a while.
+
+    Time to live is configured per OID prefix, the longest matching
+    prefix wins. Var-binds not covered by any prefix are not cached.
+
+    Lookups are all-or-nothing: cached var-binds are only served if
+    every requested var-bind is cached.
+    """
+    def __init__(self, ttls, maxSize):
+        # OID prefix -> TTL
+        self._ttls = {}
+
+        for oidPrefix, ttl in ttls:
+            self._ttls[tuple(oidPrefix)] = ttl
+
+        self._prefixLengths = sorted(set([len(x) for x in self._ttls]), reverse=True)
+
+        self._entries = cache.LruCache(maxSize)
+
+    @classmethod
+    def fromConfig(cls, ttlList, maxSize):
+        """Build cache from list of *OID-prefix:seconds* strings"""
+        ttls = []
+
+        for entry in ttlList:
+            try:
+                oidPrefix, ttl = entry.rsplit(':', 1)
+                ttls.append((rfc1902.ObjectName(oidPrefix), float(ttl)))
+
+            except Exception:
+                raise SnmpResponderError('bad cache TTL specification %s: %s' % (entry, sys.exc_info()[1]))
+
+        return cls(ttls, maxSize)
+
+    def getTtl(self, oid):
+        oid = tuple(oid)
+
+        for prefixLength in self._prefixLengths:
+            try:
+                return self._ttls[oid[:prefixLength]]
+
+            except KeyError:
+                continue
+
+    def getVarBinds(self, varBinds, nextFlag=False):
+        now = time.time()
+
+        cachedVarBinds = []
+
+        for oid, _ in varBinds:
+            key = nextFlag, oid
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+
+            expiresAt, varBind = entry
+
+            if expiresAt < now:
+                self._entries.pop(key)
+                return
+
+            cachedVarBinds.append(varBind)
+
+        return cachedVarBinds
+
+    def setVarBinds(self, reqVarBinds, rspVarBinds, nextFlag=False):
+        now = time.time()
+
+        for (reqOid, _), varBind in zip(reqVarBinds, rspVarBinds):
+            oid, value = varBind
+
+            if value.tagSet in EXCEPTION_TAGSETS:
+                continue
+
+            ttl = self.getTtl(oid)
+            if ttl:
+                self._entries.set((nextFlag, reqOid), (now + ttl, varBind))
+
+    def clear(self):
+        self._entries.clear()
+
+    def getStats(self):
+        return self._entries.getStats()
@@ -0,0 +1,91 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+import time
+
+from pysnmp.smi import error as smi_error
+
+from snmpresponder import log
+
+
+class LazyMibTree(object):
+    """Stand-in for the MIB tree loaded on first use.
+
+    The first MIB tree operation starts `loadFun(*args)` call in the
+    *executor*, meanwhile MIB tree operations are queued up. Once the
+    `poll()` call (periodically made from the main loop) finds the MIB
+    tree loaded, it returns whatever `loadFun()` has returned, then
+    `resume()` applies the queued up operations to the MIB tree.
+
+    If loading fails, queued up operations fail with genErr, so do the
+    operations coming in the next *retryInterval* seconds. Then the next
+    operation starts loading over.
+    """
+    def __init__(self, mibTreeId, retryInterval, executor, loadFun, *args):
+        self._mibTreeId = mibTreeId
+        self._retryInterval = retryInterval
+        self._executor = executor
+        self._loadFun = loadFun
+        self._args = args
+        self._future = None
+        self._startedAt = None
+        self._failedAt = None
+        self._queue = []
+
+    def _enqueue(self, call, varBinds, context):
+        if self._future is None:
+            if self._failedAt is not None and time.time() - self._failedAt < self._retryInterval:
+                context['cbFun'](varBinds, **dict(context, error=smi_error.GenError()))
+                return
+
+            log.info('loading MIB tree ID %s on first use...' % self._mibTreeId)
+
+            self._startedAt = time.time()
+            self._future = self._executor.submit(self._loadFun, *self._args)
+
+        self._queue.append((call, varBinds, context))
+
+    def readMibObjects(self, *varBinds, **context):
+        self._enqueue('readMibObjects', varBinds, context)
+
+    def readNextMibObjects(self, *varBinds, **context):
+        self._enqueue('readNextMibObjects', varBinds, context)
+
+    def writeMibObjects(self, *varBinds, **context):
+        self._enqueue('writeMibObjects', varBinds, context)
+
+    def poll(self):
+        """Return `loadFun()` result once MIB tree is loaded, else `None`"""
+        if self._future is None or not self._future.done():
+            return
+
+        future, self._future = self._future, None
+
+        try:
+            return future.result()
+
+        except Exception:
+            self._failedAt = time.time()
+
+            log.error('MIB tree ID %s not loaded in %.3f seconds, retrying in %s seconds: %s' % (
+                self._mibTreeId, self._failedAt - self._startedAt, self._retryInterval, sys.exc_info()[1]))
+
+        queue, self._queue = self._queue, []
+
+        for call, varBinds, context in queue:
+            context['cbFun'](varBinds, **dict(context, error=smi_error.GenError()))
+
+    def resume(self, mibInstrum):
+        """Apply queued up operations to the loaded MIB tree"""
+        log.info('MIB tree ID %s loaded on first use in %.3f seconds, '
+                 '%s operation(s) waited for it' % (
+                     self._mibTreeId, time.time() - self._startedAt, len(self._queue)))
+
+        queue, self._queue = self._queue, []
+
+        for call, varBinds, context in queue:
+            getattr(mibInstrum, call)(*varBinds, **context)
@@ -0,0 +1,175 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+import time
+import threading
+
+from snmpresponder.error import SnmpResponderError
+
+# seconds to wait for a refresh not limited by max staleness
+FETCH_TIMEOUT = 60
+
+
+class RefreshEntry(object):
+    def __init__(self, fetchFun, refreshInterval, maxStaleness):
+        self.fetchFun = fetchFun
+        self.refreshInterval = refreshInterval
+        self.maxStaleness = maxStaleness
+        self.value = None
+        self.updatedAt = None
+        self.pendingSince = None
+        # ID of the fetch in flight, if any
+        self.fetchId = 0
+        self.waiters = []
+
+
+class RefreshScheduler(object):
+    """Keep values of slow MIB objects fresh in background.
+
+    MIB objects register a function fetching the value from the backend
+    under some key. The scheduler calls it every *refreshInterval*
+    seconds (driven by the `tick()` calls from the main loop) and keeps
+    the last known value, which readers get immediately. Values older
+    than *maxStaleness* seconds are not served, readers wait for the
+    refresh instead. Zero *maxStaleness* means no limit.
+
+    The `fetchFun(cbFun)` function must start fetching the value and
+    return, once done it should call `cbFun(value)` or
+    `cbFun(None, error=exc)` (possibly from another thread). The refresh
+    not completed in *maxStaleness* seconds (*fetchTimeout* if there is
+    no limit) fails, so do the readers waiting for it.
+
+    Times are taken from the *clock* (`time.time()` by default).
+    """
+    def __init__(self, refreshInterval, maxStaleness=0, fetchTimeout=FETCH_TIMEOUT, clock=time.time):
+        self._refreshInterval = refreshInterval
+        self._maxStaleness = maxStaleness
+        self._fetchTimeout = fetchTimeout
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.failures = 0
+        self.maxLag = 0
+        self.totalLag = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def register(self, key, fetchFun, refreshInterval=None, maxStaleness=None):
+        if key in self._entries:
+            raise SnmpResponderError('refresh key %s already registered' % (key,))
+
+        if refreshInterval is None:
+            refreshInterval = self._refreshInterval
+
+        if maxStaleness is None:
+            maxStaleness = self._maxStaleness
+
+        self._entries[key] = RefreshEntry(fetchFun, refreshInterval, maxStaleness)
+
+    def read(self, key, cbFun):
+        """Call `cbFun(value)` with fresh enough value, possibly later"""
+        entry = self._entries[key]
+
+        now = self._clock()
+
+        with self._lock:
+            if (entry.updatedAt is not None and
+                    (not entry.maxStaleness or now - entry.updatedAt < entry.maxStaleness)):
+                value = entry.value
+
+            else:
+                entry.waiters.append(cbFun)
+                cbFun = None
+
+        if cbFun is None:
+            self._refresh(key, entry, now)
+
+        else:
+            cbFun(value)
+
+            if now - entry.updatedAt >= entry.refreshInterval:
+                self._refresh(key, entry, now)
+
+    def tick(self, timeNow=None):
+        """Start due refreshes, to be called periodically from main loop"""
+        # I/O engines tick on different clocks, stick to our own
+        now = self._clock()
+
+        for key, entry in self._entries.items():
+            if entry.pendingSince is not None:
+                if now - entry.pendingSince > (entry.maxStaleness or self._fetchTimeout):
+                    # give up waiting, fail queued readers and retry
+                    self._complete(key, entry, entry.fetchId, None, SnmpResponderError('refresh of %s timed out' % (key,)))
+
+                continue
+
+            if entry.updatedAt is None or now - entry.updatedAt >= entry.refreshInterval:
+                self._refresh(key, entry, now)
+
+    def _refresh(self, key, entry, now):
+        with self._lock:
+            if entry.pendingSince is not None:
+                return
+
+            entry.pendingSince = now
+            entry.fetchId += 1
+
+            fetchId = entry.fetchId
+
+        def cbFun(value, error=None):
+            self._complete(key, entry, fetchId, value, error)
+
+        try:
+            entry.fetchFun(cbFun)
+
+        except Exception:
+            self._complete(key, entry, fetchId, None, sys.exc_info()[1])
+
+    def _complete(self, key, entry, fetchId, value, error):
+        now = self._clock()
+
+        with self._lock:
+            if entry.pendingSince is None or fetchId != entry.fetchId:
+                # late completion of timed out refresh
+                return
+
+            entry.pendingSince = None
+
+            waiters, entry.waiters = entry.waiters, []
+
+            if error is None:
+                if entry.updatedAt is not None:
+                    # how long the value has been past due
+                    lag = max(0, now - entry.updatedAt - entry.refreshInterval)
+                    self.totalLag += lag
+                    self.maxLag = max(self.maxLag, lag)
+
+                entry.value = value
+                entry.updatedAt = now
+
+                self.refreshes += 1
+
+            else:
+                self.failures += 1
+
+        for cbFun in waiters:
+            if error is None:
+                cbFun(value)
+
+            else:
+                cbFun(None, error=error)
+
+    def getStats(self):
+        return {
+            'objects': len(self._entries),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'max-lag': '%.3f' % self.maxLag,
+            'avg-lag': '%.3f' % (self.refreshes and self.totalLag / self.refreshes or 0)
+        }
@@ -0,0 +1,209 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import sys
+
+from pysnmp.proto import rfc1902
+
+from snmpresponder.error import SnmpResponderError
+from snmpresponder import log, classifier
+
+
+class RoutingTables(object):
+    """Request classification and routing tables built from configuration.
+
+    Built from configuration alone (unlike SNMP engines), therefore can
+    be saved along with the parsed configuration and loaded back. The
+    exception is SNMP credentials map which refers to SNMP engines and
+    gets filled in once they are configured.
+    """
+    def __init__(self):
+        self.credIdMap = {}
+        self.peerIdMap = {}
+        self.peerPrefixMap = {}
+        # transport domains having peer patterns telling ports apart
+        self.peerPortDomains = set()
+        self.contextIdList = classifier.RegExpClassifier()
+        self.contentIdList = classifier.RegExpClassifier()
+        self.contentPrefixList = classifier.OidPrefixClassifier()
+        self.firstRegExpContentIdx = None
+        self.pluginIdMap = {}
+        self.routingMap = {}
+
+
+def buildRoutingTables(cfgTree, knownPduTypes):
+    """Build `RoutingTables` from configuration tree.
+
+    Raise `SnmpResponderError` on configuration errors.
+    """
+    routingTables = RoutingTables()
+
+    peerIdMap = routingTables.peerIdMap
+    peerPrefixMap = routingTables.peerPrefixMap
+    contextIdList = routingTables.contextIdList
+    contentIdList = routingTables.contentIdList
+    contentPrefixList = routingTables.contentPrefixList
+    pluginIdMap = routingTables.pluginIdMap
+    routingMap = routingTables.routingMap
+
+    duplicates = {}
+
+    for peerCfgPath in cfgTree.getPathsToAttr('snmp-peer-id'):
+        peerId = cfgTree.getAttrValue('snmp-peer-id', *peerCfgPath)
+        if peerId in duplicates:
+            raise SnmpResponderError('duplicate snmp-peer-id=%s at %s and %s' % (peerId, '.'.join(peerCfgPath), '.'.join(duplicates[peerId])))
+
+        duplicates[peerId] = peerCfgPath
+
+        log.info('configuring peer ID %s (at %s)...' % (peerId, '.'.join(peerCfgPath)))
+        transportDomain = cfgTree.getAttrValue('snmp-transport-domain', *peerCfgPath)
+
+        peerPrefixes = cfgTree.getAttrValue('snmp-peer-address-prefix-list', *peerCfgPath, default=[], vector=True)
+
+        if peerPrefixes:
+            bindPrefixes = cfgTree.getAttrValue('snmp-bind-address-prefix-list', *peerCfgPath,
+                                                default=['0.0.0.0/0', '::/0'], vector=True)
+
+            if transportDomain not in peerPrefixMap:
+                peerPrefixMap[transportDomain] = classifier.AddressPrefixClassifier()
+
+            for peerPrefix in peerPrefixes:
+                for bindPrefix in bindPrefixes:
+                    try:
+                        peerPrefixMap[transportDomain].add(peerId, peerPrefix, bindPrefix)
+
+                    except SnmpResponderError:
+                        raise SnmpResponderError('bad snmp-peer-id=%s at %s: %s' % (peerId, '.'.join(peerCfgPath), sys.exc_info()[1]))
+
+            # regular expressions are optional when prefixes are present
+            defaultPatterns = {'default': []}
+
+        else:
+            defaultPatterns = {}
+
+        for peerAddress in cfgTree.getAttrValue('snmp-peer-address-pattern-list', *peerCfgPath, vector=True, **defaultPatterns):
+            for bindAddress in cfgTree.getAttrValue('snmp-bind-address-pattern-list', *peerCfgPath, vector=True, **defaultPatterns):
+                if transportDomain not in peerIdMap:
+                    peerIdMap[transportDomain] = classifier.RegExpClassifier()
+
+                if not (classifier.isPortAgnostic(peerAddress) and
+                        classifier.isPortAgnostic(bindAddress)):
+                    routingTables.peerPortDomains.add(transportDomain)
+
+                try:
+                    peerIdMap[transportDomain].add(peerId, peerAddress + '#' + bindAddress)
+
+                except SnmpResponderError:
+                    raise SnmpResponderError('bad snmp-peer-id=%s at %s: %s' % (peerId, '.'.join(peerCfgPath), sys.exc_info()[1]))
+
+    duplicates = {}
+
+    for contextCfgPath in cfgTree.getPathsToAttr('snmp-context-id'):
+        contextId = cfgTree.getAttrValue('snmp-context-id', *contextCfgPath)
+        if contextId in duplicates:
+            raise SnmpResponderError('duplicate snmp-context-id=%s at %s and %s' % (contextId, '.'.join(contextCfgPath), '.'.join(duplicates[contextId])))
+
+        duplicates[contextId] = contextCfgPath
+
+        k = '#'.join(
+            (cfgTree.getAttrValue('snmp-context-engine-id-pattern', *contextCfgPath),
+             cfgTree.getAttrValue('snmp-context-name-pattern', *contextCfgPath))
+        )
+
+        log.info('configuring context ID %s (at %s), composite key: %s' % (contextId, '.'.join(contextCfgPath), k))
+
+        try:
+            contextIdList.add(contextId, k)
+
+        except SnmpResponderError:
+            raise SnmpResponderError('bad snmp-context-id=%s at %s: %s' % (contextId, '.'.join(contextCfgPath), sys.exc_info()[1]))
+
+    duplicates = {}
+
+    firstRegExpContentIdx = None
+
+    for contentIdx, contentCfgPath in enumerate(cfgTree.getPathsToAttr('snmp-content-id')):
+        contentId = cfgTree.getAttrValue('snmp-content-id', *contentCfgPath)
+        if contentId in duplicates:
+            raise SnmpResponderError('duplicate snmp-content-id=%s at %s and %s' % (contentId, '.'.join(contentCfgPath), '.'.join(duplicates[contentId])))
+
+        duplicates[contentId] = contentCfgPath
+
+        pduTypes = cfgTree.getAttrValue('snmp-pdu-type-list', *contentCfgPath, default=None, vector=True)
+        oidPrefixes = cfgTree.getAttrValue('snmp-pdu-oid-prefix-list', *contentCfgPath, default=None, vector=True)
+
+        if pduTypes is not None or oidPrefixes is not None:
+            for pduType in pduTypes or ():
+                if pduType not in knownPduTypes:
+                    raise SnmpResponderError('unknown PDU type %s for snmp-content-id=%s at %s' % (pduType, contentId, '.'.join(contentCfgPath)))
+
+            try:
+                oidPrefixes = [rfc1902.ObjectName(x) for x in oidPrefixes or ()]
+
+            except Exception:
+                raise SnmpResponderError('bad OID prefix for snmp-content-id=%s at %s: %s' % (contentId, '.'.join(contentCfgPath), sys.exc_info()[1]))
+
+            log.info('configuring content ID %s (at %s), PDU types: %s, OID prefixes: %s' % (contentId, '.'.join(contentCfgPath), pduTypes and ', '.join(pduTypes) or '<any>', oidPrefixes and ', '.join([str(x) for x in oidPrefixes]) or '<any>'))
+
+            contentPrefixList.add((contentIdx, contentId), pduTypes, oidPrefixes)
+
+            continue
+
+        if firstRegExpContentIdx is None:
+            firstRegExpContentIdx = contentIdx
+
+        for x in cfgTree.getAttrValue('snmp-pdu-oid-prefix-pattern-list', *contentCfgPath, vector=True):
+            k = '#'.join([cfgTree.getAttrValue('snmp-pdu-type-pattern', *contentCfgPath), x])
+
+            log.info('configuring content ID %s (at %s), composite key: %s' % (contentId, '.'.join(contentCfgPath), k))
+
+            try:
+                contentIdList.add((contentIdx, contentId), k)
+
+            except SnmpResponderError:
+                raise SnmpResponderError('bad snmp-content-id=%s at %s: %s' % (contentId, '.'.join(contentCfgPath), sys.exc_info()[1]))
+
+    del duplicates
+
+    for peerIdList in peerIdMap.values():
+        peerIdList.compile()
+
+    contextIdList.compile()
+    contentIdList.compile()
+
+    for pluginCfgPath in cfgTree.getPathsToAttr('using-plugin-id-list'):
+        pluginIdList = cfgTree.getAttrValue('using-plugin-id-list', *pluginCfgPath, vector=True)
+        log.info('configuring plugin ID(s) %s (at %s)...' % (','.join(pluginIdList), '.'.join(pluginCfgPath)))
+        for credId in cfgTree.getAttrValue('matching-snmp-credentials-id-list', *pluginCfgPath, vector=True):
+            for peerId in cfgTree.getAttrValue('matching-snmp-peer-id-list', *pluginCfgPath, vector=True):
+                for contextId in cfgTree.getAttrValue('matching-snmp-context-id-list', *pluginCfgPath, vector=True):
+                    for contentId in cfgTree.getAttrValue('matching-snmp-content-id-list', *pluginCfgPath, vector=True):
+                        k = credId, contextId, peerId, contentId
+                        if k in pluginIdMap:
+                            raise SnmpResponderError('duplicate snmp-credentials-id %s, snmp-context-id %s, snmp-peer-id %s, snmp-content-id %s at plugin-id(s) %s' % (credId, contextId, peerId, contentId, ','.join(pluginIdList)))
+                        else:
+                            log.info('configuring plugin(s) %s (at %s), composite key: %s' % (','.join(pluginIdList), '.'.join(pluginCfgPath), '/'.join(k)))
+
+                            pluginIdMap[k] = pluginIdList
+
+    for routeCfgPath in cfgTree.getPathsToAttr('using-mib-tree-id'):
+        mibTreeId = cfgTree.getAttrValue('using-mib-tree-id', *routeCfgPath)
+        log.info('configuring destination MIB tree ID(s) %s (at %s)...' % (mibTreeId, '.'.join(routeCfgPath)))
+        for credId in cfgTree.getAttrValue('matching-snmp-credentials-id-list', *routeCfgPath, vector=True):
+            for peerId in cfgTree.getAttrValue('matching-snmp-peer-id-list', *routeCfgPath, vector=True):
+                for contextId in cfgTree.getAttrValue('matching-snmp-context-id-list', *routeCfgPath, vector=True):
+                    for contentId in cfgTree.getAttrValue('matching-snmp-content-id-list', *routeCfgPath, vector=True):
+                        k = credId, contextId, peerId, contentId
+                        if k in routingMap:
+                            raise SnmpResponderError('duplicate snmp-credentials-id %s, snmp-context-id %s, snmp-peer-id %s, snmp-content-id %s at mib-tree-id(s) %s' % (credId, contextId, peerId, contentId, mibTreeId))
+                        else:
+                            routingMap[k] = mibTreeId
+
+                        log.info('configuring MIB tree routing to %s (at %s), composite key: %s' % (mibTreeId, '.'.join(routeCfgPath), '/'.join(k)))
+
+    routingTables.firstRegExpContentIdx = firstRegExpContentIdx
+
+    return routingTables
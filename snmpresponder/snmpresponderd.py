@@ -12,6 +12,10 @@ import traceback
 import random
 import re
 import socket
+import gc
+import signal
+import time
+import threading
 import pkg_resources
 from pysnmp.error import PySnmpError
 from pysnmp.entity import engine, config
@@ -25,7 +29,6 @@ try:
     from pysnmp.carrier.asyncore.dgram import unix
 except ImportError:
     unix = None
-from pysnmp.carrier.asyncore.dispatch import AsyncoreDispatcher
 from pysnmp.proto import rfc1902, rfc1905
 from pysnmp.proto.api import v2c
 from pysnmp.smi import builder
@@ -35,7 +38,7 @@ from pysnmp.smi import error as smi_error
 from pyasn1 import debug as pyasn1_debug
 from pysnmp import debug as pysnmp_debug
 from snmpresponder.error import SnmpResponderError
-from snmpresponder import log, daemon, cparser, macro, endpoint
+from snmpresponder import log, daemon, cparser, cfgcache, macro, endpoint, cache, routing, ioengine, dedup, mibcache, refresh, batch, executor, deadline, breaker, httpclient, watcher, mibtree
 from snmpresponder.plugins.manager import PluginManager
 from snmpresponder.plugins import status
 from snmpresponder.lazylog import LazyLogString
@@ -44,6 +47,26 @@ PROGRAM_NAME = 'snmpresponder'
 CONFIG_VERSION = '1'
 PLUGIN_API_VERSION = 1
 CONFIG_FILE = '/etc/snmpresponder/snmpresponderd.cfg'
+ROUTING_CACHE_SIZE = 4096
+MIB_TREE_CACHE_SIZE = 10000
+BATCH_IO_SIZE = 32
+MIB_TREE_REFRESH_INTERVAL = 60
+REFRESH_TICK_INTERVAL = 1
+MIB_TREE_OPTIONS = ('parallel-read',)
+EXECUTOR_POOL_SIZE = 8
+DEADLINE_ACTIONS = ('gen-err', 'drop')
+DEADLINE_TICK_INTERVAL = 0.5
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+HTTP_CLIENT_MAX_CONNECTIONS = 4
+HTTP_CLIENT_TIMEOUT = 10
+PROCESS_POOL_SIZE = 0
+RELOAD_CHECK_INTERVAL = 1
+MIB_TREE_WATCH_TICK_INTERVAL = 1
+MIB_TREE_LOAD_MODES = ('sequential', 'parallel', 'lazy')
+MIB_TREE_LOADER_POOL_SIZE = 4
+MIB_TREE_LOAD_RETRY_INTERVAL = 10
+MIB_TREE_LOAD_TICK_INTERVAL = 0.5
 
 authProtocols = {
   'MD5': config.USM_AUTH_HMAC96_MD5,
@@ -82,14 +105,100 @@ def main():
 
         MIB_INTRUMENTATION_CALL = None
 
+        def __init__(self, *args, **kwargs):
+            super(MibTreeProxyMixIn, self).__init__(*args, **kwargs)
+            # request contexts of requests being processed by stateReference
+            self._requestContexts = {}
+
+        def releaseStateInformation(self, stateReference):
+            self._requestContexts.pop(stateReference, None)
+
+            if requestDeduplicator:
+                # original request is gone unanswered, so do its retransmissions
+                for waiterStateReference in requestDeduplicator.finish(stateReference):
+                    self.releaseStateInformation(waiterStateReference)
+
+            super(MibTreeProxyMixIn, self).releaseStateInformation(stateReference)
+
+        def sendVarBinds(self, snmpEngine, stateReference, errorStatus, errorIndex, varBinds):
+            super(MibTreeProxyMixIn, self).sendVarBinds(
+                snmpEngine, stateReference, errorStatus, errorIndex, varBinds)
+
+            if requestDeduplicator:
+                response = errorStatus, errorIndex, varBinds
+
+                for waiterStateReference in requestDeduplicator.finish(stateReference, response):
+                    super(MibTreeProxyMixIn, self).sendVarBinds(
+                        snmpEngine, waiterStateReference, *response)
+                    self.releaseStateInformation(waiterStateReference)
+
         def _getMgmtFun(self, contextName):
             return self._routeToMibTree
 
+        def _getRequestContext(self, stateReference):
+            try:
+                return self._requestContexts[stateReference]
+
+            except KeyError:
+                pass
+
+            # request observer has just handed over the context of the
+            # request being received, from now on it lives with the request
+            mibTreeReq = gCurrentRequestContext.copy()
+
+            gCurrentRequestContext.clear()
+
+            self._requestContexts[stateReference] = mibTreeReq
+
+            return mibTreeReq
+
+        def _isRetransmission(self, snmpEngine, stateReference, mibTreeReq):
+            pdu = mibTreeReq['snmp-pdu']
+
+            key = (
+                str(mibTreeReq['snmp-engine-id']),
+                str(mibTreeReq['snmp-transport-domain']),
+                mibTreeReq['snmp-peer-address'],
+                mibTreeReq['snmp-peer-port'],
+                int(mibTreeReq['snmp-security-model']),
+                str(mibTreeReq['snmp-security-name']),
+                str(mibTreeReq['snmp-context-engine-id']),
+                str(mibTreeReq['snmp-context-name']),
+                pdu.tagSet,
+                int(v2c.apiPDU.getRequestID(pdu)),
+                tuple([x[0] for x in v2c.apiPDU.getVarBinds(pdu)])
+            )
+
+            response = requestDeduplicator.getResponse(key)
+            if response is not None:
+                log.debug('retransmitted request, replaying recent response', ctx=LogString(mibTreeReq))
+                self.sendVarBinds(snmpEngine, stateReference, *response)
+                self.releaseStateInformation(stateReference)
+                return True
+
+            if requestDeduplicator.attach(key, stateReference):
+                log.debug('retransmitted request, waiting for the original request to complete', ctx=LogString(mibTreeReq))
+                return True
+
+            requestDeduplicator.start(key, stateReference)
+
+            return False
+
         def _routeToMibTree(self, *varBinds, **context):
 
             cbFun = context['cbFun']
 
-            mibTreeReq = gCurrentRequestContext.copy()
+            snmpEngine = context['snmpEngine']
+
+            stateReference = context['stateReference']
+
+            newRequest = stateReference not in self._requestContexts
+
+            mibTreeReq = self._getRequestContext(stateReference)
+
+            if (newRequest and requestDeduplicator and
+                    self._isRetransmission(snmpEngine, stateReference, mibTreeReq)):
+                return
 
             pdu = mibTreeReq['snmp-pdu']
 
@@ -138,22 +247,153 @@ def main():
 
             log.debug('received SNMP message, applied on mib-tree-id %s' % mibTreeId, ctx=logCtx)
 
-            cbCtx = pluginIdList, mibTreeId, mibTreeReq, snmpEngine, reqCtx, context['cbFun']
+            mibTreeCache = mibTreeCacheMap.get(mibTreeId)
+
+            if mibTreeCache:
+                if self.MIB_INTRUMENTATION_CALL == 'writeMibObjects':
+                    mibTreeCache.clear()
+
+                else:
+                    cachedVarBinds = mibTreeCache.getVarBinds(
+                        varBinds, self.MIB_INTRUMENTATION_CALL == 'readNextMibObjects')
+
+                    if cachedVarBinds is not None:
+                        log.debug('var-binds served from mib-tree-id %s cache' % mibTreeId, ctx=logCtx)
+                        cbFun(cachedVarBinds, **context)
+                        return
+
+            deadlineToken = None
+
+            if mibTreeId in mibTreeDeadlineMap:
+                timeout, deadlineAction = mibTreeDeadlineMap[mibTreeId]
+
+                # GETBULK may walk MIB tree a few times, the deadline
+                # covers the whole request
+                requestDeadline = mibTreeReq.setdefault('request-deadline', time.time() + timeout)
+
+                deadlineToken = deadlineTracker.add(
+                    requestDeadline, self._expireRequest, varBinds, deadlineAction, context)
+
+                # MIB objects may not bother calling backends once it passes
+                context = dict(context, deadline=requestDeadline)
+
+            cbCtx = pluginIdList, mibTreeId, mibTreeReq, snmpEngine, reqCtx, context['cbFun'], varBinds, deadlineToken
 
             mgmtFun = getattr(mibInstrum, self.MIB_INTRUMENTATION_CALL)
 
-            mgmtFun(*varBinds, **dict(context, cbFun=self._mibTreeCbFun, cbCtx=cbCtx, acFun=None))
+            if self.MIB_INTRUMENTATION_CALL == 'writeMibObjects':
+                mgmtFun(*varBinds, **dict(context, cbFun=self._mibTreeCbFun, cbCtx=cbCtx, acFun=None))
+                return
+
+            # batch-capable MIB objects queue up var-binds while the
+            # request is dispatched, then read them all at once
+            batchCollector = batch.BatchCollector()
+
+            context = dict(context, cbFun=self._mibTreeCbFun, cbCtx=cbCtx, acFun=None,
+                           batchCollector=batchCollector)
+
+            if len(varBinds) > 1 and 'parallel-read' in mibTreeOptionsMap.get(mibTreeId, ()):
+                self._fanOutToMibTree(mgmtFun, *varBinds, **context)
+
+            else:
+                mgmtFun(*varBinds, **context)
+
+            batchCollector.flush()
+
+        @staticmethod
+        def _fanOutToMibTree(mgmtFun, *varBinds, **context):
+            """Apply each var-bind to MIB tree on its own, all at once.
+
+            The instrumentation controller would not call the next MIB
+            object until the previous one is done. Here slow asynchronous
+            MIB objects wait for their backends concurrently.
+            """
+            cbFun = context['cbFun']
+
+            rspVarBinds = list(varBinds)
+
+            # [var-binds pending, (idx, error) pairs]
+            state = [len(varBinds), []]
+
+            # MIB objects may call back from other threads
+            lock = threading.Lock()
+
+            def getCbFun(idx):
+
+                def _cbFun(varBinds, **context):
+                    with lock:
+                        err = context.get('error')
+                        if err:
+                            state[1].append((idx, err))
+
+                        else:
+                            rspVarBinds[idx] = varBinds[0]
+
+                        state[0] -= 1
+
+                        if state[0]:
+                            return
+
+                    if not state[1]:
+                        cbFun(rspVarBinds, **dict(context, cbFun=cbFun))
+                        return
+
+                    # SNMP can only report one error, the leftmost wins
+                    errIdx, err = min(state[1], key=lambda x: x[0])
+
+                    if len(state[1]) > 1:
+                        log.debug('%s of %s var-binds failed, reporting %s' % (len(state[1]), len(rspVarBinds), err))
+
+                    if hasattr(err, 'update'):
+                        # error index is relative to the var-bind
+                        err.update({'idx': errIdx})
+
+                    cbFun(rspVarBinds, **dict(context, cbFun=cbFun, error=err))
+
+                return _cbFun
+
+            for idx, varBind in enumerate(varBinds):
+                mgmtFun(varBind, **dict(context, cbFun=getCbFun(idx)))
+
+        def _expireRequest(self, varBinds, deadlineAction, context):
+            stateReference = context['stateReference']
+
+            logCtx = LogString(self._requestContexts.get(stateReference, {}))
+
+            if deadlineAction == 'drop':
+                log.info('request deadline passed, dropping request', ctx=logCtx)
+                self.releaseStateInformation(stateReference)
+
+            else:
+                log.info('request deadline passed, responding with genErr', ctx=logCtx)
+                cbFun = context['cbFun']
+                cbFun(varBinds, **dict(context, error=smi_error.GenError()))
 
         # TODO: it just occurred to me that `*varBinds` would look more consistent
         def _mibTreeCbFun(self, varBinds, **context):
-            pluginIdList, mibTreeId, mibTreeReq, snmpEngine, reqCtx, cbFun = context['cbCtx']
+            pluginIdList, mibTreeId, mibTreeReq, snmpEngine, reqCtx, cbFun, reqVarBinds, deadlineToken = context['cbCtx']
 
             logCtx = LogString(mibTreeReq)
 
+            if deadlineToken is not None and not deadlineTracker.remove(deadlineToken):
+                log.debug('MIB tree responded after request deadline, discarding response', ctx=logCtx)
+                return
+
+            mibTreeCache = mibTreeCacheMap.get(mibTreeId)
+
             err = context.get('error')
             if err:
                 log.info('MIB operation resulted in error: %s' % err, ctx=logCtx)
 
+            elif mibTreeCache:
+                if self.MIB_INTRUMENTATION_CALL == 'writeMibObjects':
+                    # reads completed while we were writing might be stale
+                    mibTreeCache.clear()
+
+                else:
+                    mibTreeCache.setVarBinds(
+                        reqVarBinds, varBinds, self.MIB_INTRUMENTATION_CALL == 'readNextMibObjects')
+
             cbFun(varBinds, **dict(context, cbFun=cbFun))
 
             # plugins need to work at var-binds level
@@ -234,8 +474,8 @@ def main():
         securityModel = variables.get('securityModel', 0)
 
         logMsg = 'SNMPv%s auth failure' % securityModel
-        logMsg += ' at %s:%s' % variables['transportAddress'].getLocalAddress()
-        logMsg += ' from %s:%s' % variables['transportAddress']
+        logMsg += ' at %s' % endpoint.formatTransportAddress(getBindAddress(variables['transportDomain'], variables['transportAddress']))
+        logMsg += ' from %s' % endpoint.formatTransportAddress(variables['transportAddress'])
 
         statusInformation = variables.get('statusInformation', {})
 
@@ -261,16 +501,27 @@ def main():
         cbCtx.clear()
         cbCtx.update(mibTreeReq)
 
+    def getBindAddress(transportDomain, transportAddress):
+        return ioengine.getLocalAddress(
+            transportAddress, bindAddressMap.get(str(transportDomain), ('?', '?'))
+        )
+
     def requestObserver(snmpEngine, execpoint, variables, cbCtx):
 
+        peerAddress, peerPort = endpoint.splitTransportAddress(variables['transportAddress'])
+
+        bindAddress, bindPort = endpoint.splitTransportAddress(
+            getBindAddress(variables['transportDomain'], variables['transportAddress'])
+        )
+
         mibTreeReq = {
             'callflow-id': '%10.10x' % random.randint(0, 0xffffffffff),
             'snmp-engine-id': snmpEngine.snmpEngineID,
             'snmp-transport-domain': variables['transportDomain'],
-            'snmp-peer-address': variables['transportAddress'][0],
-            'snmp-peer-port': variables['transportAddress'][1],
-            'snmp-bind-address': variables['transportAddress'].getLocalAddress()[0],
-            'snmp-bind-port': variables['transportAddress'].getLocalAddress()[1],
+            'snmp-peer-address': peerAddress,
+            'snmp-peer-port': peerPort,
+            'snmp-bind-address': bindAddress,
+            'snmp-bind-port': bindPort,
             'snmp-security-model': variables['securityModel'],
             'snmp-security-level': variables['securityLevel'],
             'snmp-security-name': variables['securityName'],
@@ -285,65 +536,396 @@ def main():
             # SNMPv1/v2c
             mibTreeReq['snmp-security-engine-id'] = mibTreeReq['snmp-engine-id']
 
-        mibTreeReq['snmp-credentials-id'] = macro.expandMacro(
-            credIdMap.get(
+        pdu = variables['pdu']
+
+        varBinds = v2c.apiPDU.getVarBinds(pdu)
+
+        tables = gRoutingTables['current']
+
+        transportDomain = str(variables['transportDomain'])
+
+        # peer, credentials and context classification inputs, ports
+        # only matter if some peer pattern can tell them apart
+        decisionKey = (
+            str(snmpEngine.snmpEngineID),
+            transportDomain,
+            int(variables['securityModel']),
+            int(variables['securityLevel']),
+            str(variables['securityName']),
+            str(mibTreeReq['snmp-security-engine-id']),
+            str(variables['contextEngineId']),
+            str(variables['contextName']),
+            peerAddress,
+            bindAddress
+        )
+
+        if transportDomain in tables.peerPortDomains:
+            decisionKey += (peerPort, bindPort)
+
+        # IDs are cached as configured, macros are expanded per request
+        decision = routingCache.get(decisionKey)
+
+        if decision is None:
+            credId = tables.credIdMap.get(
                 (str(snmpEngine.snmpEngineID),
                  variables['transportDomain'],
                  variables['securityModel'],
                  variables['securityLevel'],
                  str(variables['securityName']))
-            ),
-            mibTreeReq
-        )
+            )
 
-        k = '#'.join([str(x) for x in (variables['contextEngineId'], variables['contextName'])])
-        for x, y in contextIdList:
-            if y.match(k):
-                mibTreeReq['snmp-context-id'] = macro.expandMacro(x, mibTreeReq)
-                break
-            else:
-                mibTreeReq['snmp-context-id'] = None
+            k = '#'.join([str(x) for x in (variables['contextEngineId'], variables['contextName'])])
 
-        addr = '%s:%s#%s:%s' % (variables['transportAddress'][0], variables['transportAddress'][1], variables['transportAddress'].getLocalAddress()[0], variables['transportAddress'].getLocalAddress()[1])
+            contextId = tables.contextIdList.match(k)
 
-        for pat, peerId in peerIdMap.get(str(variables['transportDomain']), ()):
-            if pat.match(addr):
-                mibTreeReq['snmp-peer-id'] = macro.expandMacro(peerId, mibTreeReq)
-                break
-        else:
-            mibTreeReq['snmp-peer-id'] = None
+            peerId = None
 
-        pdu = variables['pdu']
-        k = '#'.join(
-            [snmpPduTypesMap.get(variables['pdu'].tagSet, '?'),
-             '|'.join([str(x[0]) for x in v2c.apiPDU.getVarBinds(pdu)])]
-        )
+            if transportDomain in tables.peerPrefixMap:
+                peerId = tables.peerPrefixMap[transportDomain].match(
+                    peerAddress, bindAddress
+                )
 
-        for x, y in contentIdList:
-            if y.match(k):
-                mibTreeReq['snmp-content-id'] = macro.expandMacro(x, mibTreeReq)
-                break
-            else:
-                mibTreeReq['snmp-content-id'] = None
+            if peerId is None and transportDomain in tables.peerIdMap:
+                if endpoint.isLocalDomain(variables['transportDomain']):
+                    addr = '%s#%s' % (peerAddress, bindAddress)
 
-        mibTreeReq['plugins-list'] = pluginIdMap.get(
-            (mibTreeReq['snmp-credentials-id'],
-             mibTreeReq['snmp-context-id'],
-             mibTreeReq['snmp-peer-id'],
-             mibTreeReq['snmp-content-id']), []
+                else:
+                    addr = '%s:%s#%s:%s' % (peerAddress, peerPort, bindAddress, bindPort)
+
+                peerId = tables.peerIdMap[transportDomain].match(addr)
+
+            decision = credId, contextId, peerId
+
+            routingCache.set(decisionKey, decision)
+
+        credId, contextId, peerId = decision
+
+        mibTreeReq['snmp-credentials-id'] = macro.expandMacro(credId, mibTreeReq)
+        mibTreeReq['snmp-context-id'] = macro.expandMacro(contextId, mibTreeReq)
+        mibTreeReq['snmp-peer-id'] = macro.expandMacro(peerId, mibTreeReq)
+
+        # content is classified by PDU type and OID prefixes on its own
+        pduType = snmpPduTypesMap.get(pdu.tagSet, '?')
+
+        content = tables.contentPrefixList.match(pduType, [x[0] for x in varBinds])
+
+        # regular expressions configured earlier take precedence
+        if tables.contentIdList and (content is None or content[0] > tables.firstRegExpContentIdx):
+            k = '#'.join(
+                [pduType, '|'.join([str(x[0]) for x in varBinds])]
+            )
+
+            regExpContent = tables.contentIdList.match(k)
+
+            if regExpContent and (content is None or regExpContent[0] < content[0]):
+                content = regExpContent
+
+        mibTreeReq['snmp-content-id'] = macro.expandMacro(
+            content and content[1], mibTreeReq
         )
-        mibTreeReq['mib-tree-id'] = routingMap.get(
-            (mibTreeReq['snmp-credentials-id'],
+
+        k = (mibTreeReq['snmp-credentials-id'],
              mibTreeReq['snmp-context-id'],
              mibTreeReq['snmp-peer-id'],
              mibTreeReq['snmp-content-id'])
-        )
+
+        mibTreeReq['plugins-list'] = tables.pluginIdMap.get(k, [])
+        mibTreeReq['mib-tree-id'] = tables.routingMap.get(k)
 
         mibTreeReq['snmp-pdu'] = pdu
 
         cbCtx.clear()
         cbCtx.update(mibTreeReq)
 
+    def buildCredIdMap(cfgTree):
+        """Map credentials of configured SNMP engines to credentials IDs"""
+        credIdMap = {}
+
+        for configEntryPath in cfgTree.getPathsToAttr('snmp-credentials-id'):
+            credId = cfgTree.getAttrValue('snmp-credentials-id', *configEntryPath)
+
+            engineId = cfgTree.getAttrValue('snmp-engine-id', *configEntryPath)
+
+            try:
+                snmpEngine, snmpContext, snmpEngineMap = engineIdMap[engineId]
+
+            except KeyError:
+                raise SnmpResponderError('SNMP engine for snmp-engine-id %s at %s not configured' % (engineId, '.'.join(configEntryPath)))
+
+            transportDomain = cfgTree.getAttrValue('snmp-transport-domain', *configEntryPath)
+            transportDomain = rfc1902.ObjectName(transportDomain)
+
+            try:
+                bindAddr, transportDomain = snmpEngineMap['transportDomain'][transportDomain]
+
+            except KeyError:
+                raise SnmpResponderError('transport endpoint for snmp-transport-domain %s at %s not configured' % (transportDomain, '.'.join(configEntryPath)))
+
+            securityModel = cfgTree.getAttrValue('snmp-security-model', *configEntryPath)
+            securityModel = rfc1902.Integer(securityModel)
+            securityLevel = cfgTree.getAttrValue('snmp-security-level', *configEntryPath)
+            securityLevel = rfc1902.Integer(securityLevel)
+            securityName = cfgTree.getAttrValue('snmp-security-name', *configEntryPath)
+
+            if securityName not in snmpEngineMap['securityName']:
+                raise SnmpResponderError('snmp-security-name %s at %s not configured' % (securityName, '.'.join(configEntryPath)))
+
+            configKey = (str(snmpEngine.snmpEngineID), transportDomain,
+                         securityModel, securityLevel, securityName)
+
+            if configKey in credIdMap:
+                raise SnmpResponderError('ambiguous configuration for key snmp-credentials-id=%s at %s' % (credId, '.'.join(configEntryPath)))
+
+            credIdMap[configKey] = credId
+
+        return credIdMap
+
+    def checkRoutingTables(tables):
+        for k, pluginIdList in tables.pluginIdMap.items():
+            for pluginId in pluginIdList:
+                if not pluginManager.hasPlugin(pluginId):
+                    raise SnmpResponderError('undefined plugin ID %s referenced by composite key %s' % (pluginId, '/'.join(k)))
+
+    def reloadConfig():
+        """Re-read config file, replace routing tables in use.
+
+        SNMP engines, transport endpoints, plugins and MIB trees are
+        left intact, the new configuration may only refer to those.
+        """
+        log.info('reloading config file %s...' % cfgFile)
+
+        try:
+            snapshot = cfgcache.load(cfgFile)
+
+            if snapshot:
+                newCfgTree, tables = snapshot
+
+            else:
+                newCfgTree = cparser.Config().load(cfgFile)
+
+                tables = None
+
+            if newCfgTree.getAttrValue('program-name', '', default=None) != PROGRAM_NAME:
+                raise SnmpResponderError('config file does not match program name %s' % PROGRAM_NAME)
+
+            if newCfgTree.getAttrValue('config-version', '', default=None) != CONFIG_VERSION:
+                raise SnmpResponderError('config file version is not compatible with program version %s' % CONFIG_VERSION)
+
+            if tables is None:
+                tables = routing.buildRoutingTables(newCfgTree, snmpPduTypesMap.values())
+
+            tables.credIdMap = buildCredIdMap(newCfgTree)
+
+            checkRoutingTables(tables)
+
+        except SnmpResponderError:
+            log.error('config file %s not reloaded, the old configuration stays in use: %s' % (cfgFile, sys.exc_info()[1]))
+            return
+
+        for mibTreeCfgPath in newCfgTree.getPathsToAttr('mib-tree-id'):
+            mibTreeId = newCfgTree.getAttrValue('mib-tree-id', *mibTreeCfgPath)
+            if mibTreeId not in mibTreeIdMap:
+                log.error('new MIB tree ID %s (at %s) is not loaded until restart' % (mibTreeId, '.'.join(mibTreeCfgPath)))
+
+        gRoutingTables['current'] = tables
+
+        # decisions made by the old routing tables
+        routingCache.clear()
+
+        log.info('config file %s reloaded' % cfgFile)
+
+    def getMibCodePatternPaths(mibTreeCfgPath):
+        return macro.expandMacros(
+            cfgTree.getAttrValue('mib-code-modules-pattern-list', *mibTreeCfgPath, default=[], vector=True),
+            {'config-dir': os.path.dirname(cfgFile)}
+        )
+
+    def loadMibTree(mibTreeId, mibTreeCfgPath, circuitBreakers):
+        """Load MIB implementations into a new MIB tree.
+
+        Return (mibInstrum, refreshScheduler) pair. May run in a thread.
+        """
+        startedAt = time.time()
+
+        mibTextPaths = cfgTree.getAttrValue(
+            'mib-text-search-path-list', *mibTreeCfgPath,
+            default=[], vector=True)
+
+        mibCodePatternPaths = getMibCodePatternPaths(mibTreeCfgPath)
+
+        mibBuilder = builder.MibBuilder()
+
+        compiler.addMibCompiler(mibBuilder, sources=mibTextPaths)
+
+        # managed objects can keep slow values fresh in background
+        refreshScheduler = refresh.RefreshScheduler(
+            cfgTree.getAttrValue('mib-tree-refresh-interval', *mibTreeCfgPath, default=MIB_TREE_REFRESH_INTERVAL, expect=int),
+            cfgTree.getAttrValue('mib-tree-max-staleness', *mibTreeCfgPath, default=0, expect=int)
+        )
+
+        for topDir in mibCodePatternPaths:
+
+            filenameRegExp = re.compile(os.path.basename(topDir))
+            topDir = os.path.dirname(topDir)
+
+            for root, dirs, files in os.walk(topDir):
+
+                if not files or root.endswith('__pycache__'):
+                    continue
+
+                mibBuilder.setMibSources(
+                    builder.DirMibSource(root), *mibBuilder.getMibSources()
+                )
+
+                for filename in files:
+
+                    if not filenameRegExp.match(filename):
+                        log.debug('skipping non-matching file %s while loading '
+                                  'MIB tree ID %s' % (filename, mibTreeId))
+                        continue
+
+                    module, _ = os.path.splitext(filename)
+
+                    try:
+                        mibBuilder.loadModule(
+                            module, refreshScheduler=refreshScheduler, executor=sharedExecutor,
+                            circuitBreakers=circuitBreakers, httpClient=sharedHttpClient,
+                            processPool=sharedProcessPool)
+
+                    except PySnmpError as ex:
+                        log.error('fail to load MIB implementation from file '
+                                  '%s into MIB tree ID %s' % (
+                            os.path.join(root, filename), mibTreeId))
+                        raise SnmpResponderError(str(ex))
+
+                    log.info('loaded MIB implementation file %s into MIB tree '
+                             'ID %s' % (os.path.join(root, filename), mibTreeId))
+
+        mibCodePackages = macro.expandMacros(
+            cfgTree.getAttrValue('mib-code-packages-pattern-list', *mibTreeCfgPath, default=[], vector=True),
+            {'config-dir': os.path.dirname(cfgFile)}
+        )
+
+        for mibCodePackage in mibCodePackages:
+
+            mibCodePackageRegExp = re.compile(mibCodePackage)
+
+            for entryPoint in pkg_resources.iter_entry_points('snmpresponder.mibs'):
+                log.debug('found extension entry point %s' % entryPoint.name)
+
+                mibPackage = entryPoint.load()
+
+                root = os.path.dirname(mibPackage.__file__)
+
+                mibPathSet = False
+
+                for filename in os.listdir(root):
+
+                    if filename.startswith('__init__'):
+                        continue
+
+                    if not os.path.isfile(os.path.join(root, filename)):
+                        continue
+
+                    mibPath = '.'.join((entryPoint.name, filename))
+
+                    if not mibCodePackageRegExp.match(mibPath):
+                        log.debug('extension MIB %s from %s is NOT configured, '
+                                  'skipping' % (mibPath, entryPoint.name))
+                        continue
+
+                    if not mibPathSet:
+                        mibBuilder.setMibSources(
+                            builder.DirMibSource(root), *mibBuilder.getMibSources()
+                        )
+                        mibPathSet = True
+
+                    log.debug('loading extension MIB %s from %s into MIB tree '
+                              'ID %s' % (mibPath, entryPoint.name, mibTreeId))
+
+                    module, _ = os.path.splitext(filename)
+
+                    try:
+                        mibBuilder.loadModule(
+                            module, refreshScheduler=refreshScheduler, executor=sharedExecutor,
+                            circuitBreakers=circuitBreakers, httpClient=sharedHttpClient,
+                            processPool=sharedProcessPool)
+
+                    except PySnmpError as ex:
+                        log.error('fail to load MIB implementation %s from '
+                                  '%s into MIB tree ID %s' % (mibPath, entryPoint.name,
+                                                              mibTreeId))
+                        raise SnmpResponderError(str(ex))
+
+                    log.info('loaded MIB implementation %s from %s into MIB tree '
+                             'ID %s' % (mibPath, entryPoint.name, mibTreeId))
+
+        mibInstrum = instrum.MibInstrumController(mibBuilder)
+
+        log.info('loaded MIB tree ID %s in %.3f seconds' % (mibTreeId, time.time() - startedAt))
+
+        return mibInstrum, refreshScheduler
+
+    def installMibTree(mibTreeId, mibInstrum, refreshScheduler):
+        mibTreeIdMap[mibTreeId] = mibInstrum
+
+        statsName = 'mib-tree-id %s refresh' % mibTreeId
+
+        statsSources[:] = [x for x in statsSources if x[0] != statsName]
+
+        if refreshScheduler:
+            mibTreeRefreshMap[mibTreeId] = refreshScheduler
+
+            statsSources.append((statsName, refreshScheduler))
+
+            log.info('refreshing %s MIB tree ID %s object(s) in background' % (len(refreshScheduler), mibTreeId))
+
+        else:
+            mibTreeRefreshMap.pop(mibTreeId, None)
+
+    def reloadMibTree(mibTreeId, changedFiles):
+        """Replace MIB tree with a new one loaded from MIB implementations.
+
+        Requests in progress complete against the old MIB tree.
+        """
+        if mibTreeId in mibTreeLazyMap:
+            log.debug('MIB tree ID %s is not loaded yet, changed file(s): %s' % (mibTreeId, ', '.join(changedFiles)))
+            return
+
+        log.info('reloading MIB tree ID %s, changed file(s): %s' % (mibTreeId, ', '.join(changedFiles)))
+
+        try:
+            mibInstrum, refreshScheduler = loadMibTree(
+                mibTreeId, mibTreeCfgPathMap[mibTreeId], mibTreeBreakersMap[mibTreeId])
+
+        except Exception:
+            log.error('MIB tree ID %s not reloaded, the old one stays in use: %s' % (mibTreeId, sys.exc_info()[1]))
+            return
+
+        installMibTree(mibTreeId, mibInstrum, refreshScheduler)
+
+        # values computed by the old MIB implementations
+        if mibTreeId in mibTreeCacheMap:
+            mibTreeCacheMap[mibTreeId].clear()
+
+        log.info('reloaded MIB tree ID %s' % mibTreeId)
+
+    def resumeLazyMibTrees():
+        for mibTreeId, lazyMibTree in list(mibTreeLazyMap.items()):
+            result = lazyMibTree.poll()
+            if result:
+                del mibTreeLazyMap[mibTreeId]
+
+                installMibTree(mibTreeId, *result)
+
+                lazyMibTree.resume(mibTreeIdMap[mibTreeId])
+
+    def reloadChangedMibTrees():
+        for mibTreeId, fileWatcher in list(mibTreeWatchMap.items()):
+            changedFiles = fileWatcher.changed()
+            if changedFiles:
+                reloadMibTree(mibTreeId, changedFiles)
+
     #
     # main script starts here
     #
@@ -358,19 +940,24 @@ Usage: %s [--help]
     [--pid-file=<file>]
     [--logging-method=<%s[:args>]>]
     [--log-level=<%s>]
-    [--config-file=<file>]""" % (
+    [--config-file=<file>]
+    [--compile-config]
+    [--io-engine=<%s>]
+    [--workers=<count>]""" % (
         sys.argv[0],
         '|'.join([x for x in getattr(pysnmp_debug, 'FLAG_MAP', getattr(pysnmp_debug, 'flagMap', ())) if x != 'mibview']),
         '|'.join([x for x in  getattr(pyasn1_debug, 'FLAG_MAP', getattr(pyasn1_debug, 'flagMap', ()))]),
         '|'.join(log.methodsMap),
-        '|'.join(log.levelsMap)
+        '|'.join(log.levelsMap),
+        '|'.join(ioengine.IO_ENGINES)
     )
 
     try:
         opts, params = getopt.getopt(sys.argv[1:], 'hv', [
             'help', 'version', 'debug=', 'debug-snmp=', 'debug-asn1=', 'daemonize',
             'process-user=', 'process-group=', 'pid-file=', 'logging-method=',
-            'log-level=', 'config-file='
+            'log-level=', 'config-file=', 'compile-config', 'io-engine=',
+            'workers='
         ])
 
     except Exception:
@@ -383,6 +970,9 @@ Usage: %s [--help]
 
     pidFile = ''
     cfgFile = CONFIG_FILE
+    compileFlag = False
+    ioEngineName = 'asyncore'
+    workersCount = 0
     foregroundFlag = True
     procUser = procGroup = None
 
@@ -435,6 +1025,21 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
             loggingLevel = opt[1]
         elif opt[0] == '--config-file':
             cfgFile = opt[1]
+        elif opt[0] == '--compile-config':
+            compileFlag = True
+        elif opt[0] == '--io-engine':
+            ioEngineName = opt[1]
+        elif opt[0] == '--workers':
+            try:
+                workersCount = int(opt[1])
+
+            except ValueError:
+                sys.stderr.write('ERROR: bad --workers count %s\r\n%s\r\n' % (opt[1], helpMessage))
+                return
+
+    if ioEngineName not in ioengine.IO_ENGINES:
+        sys.stderr.write('ERROR: unknown I/O engine %s\r\n%s\r\n' % (ioEngineName, helpMessage))
+        return
 
     with daemon.PrivilegesOf(procUser, procGroup):
 
@@ -448,12 +1053,33 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
             sys.stderr.write('%s\r\n%s\r\n' % (sys.exc_info()[1], helpMessage))
             return
 
-    try:
-        cfgTree = cparser.Config().load(cfgFile)
+    snapshot = None
 
-    except SnmpResponderError:
-        log.error('configuration parsing error: %s' % sys.exc_info()[1])
-        return
+    if not compileFlag:
+        try:
+            snapshot = cfgcache.load(cfgFile)
+
+        except SnmpResponderError:
+            log.error('%s, parsing config file' % sys.exc_info()[1])
+
+    if snapshot:
+        log.info('using config snapshot %s' % cfgcache.getSnapshotFile(cfgFile))
+
+        cfgTree, routingTables = snapshot
+
+    else:
+        try:
+            # snapshot key is taken before parsing, see cfgcache.save()
+            if compileFlag:
+                cfgKey = cfgcache.getKey(cfgFile)
+
+            cfgTree = cparser.Config().load(cfgFile)
+
+        except SnmpResponderError:
+            log.error('configuration parsing error: %s' % sys.exc_info()[1])
+            return
+
+        routingTables = None
 
     if cfgTree.getAttrValue('program-name', '', default=None) != PROGRAM_NAME:
         log.error('config file %s does not match program name %s' % (cfgFile, PROGRAM_NAME))
@@ -463,22 +1089,106 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
         log.error('config file %s version is not compatible with program version %s' % (cfgFile, CONFIG_VERSION))
         return
 
+    if routingTables is None:
+        try:
+            routingTables = routing.buildRoutingTables(cfgTree, snmpPduTypesMap.values())
+
+        except SnmpResponderError:
+            log.error('configuration error: %s' % sys.exc_info()[1])
+            return
+
+    if compileFlag:
+        try:
+            snapshotFile = cfgcache.save(cfgFile, cfgTree, routingTables, cfgKey)
+
+        except SnmpResponderError:
+            log.error('config file %s not compiled: %s' % (cfgFile, sys.exc_info()[1]))
+            return
+
+        log.info('config file %s compiled into %s' % (cfgFile, snapshotFile))
+        return
+
     random.seed()
 
+    # hands request context over from observers to command responders,
+    # bound to the request on its way in (see _getRequestContext)
     gCurrentRequestContext = {}
 
-    credIdMap = {}
-    peerIdMap = {}
-    contextIdList = []
-    contentIdList = []
-    pluginIdMap = {}
-    routingMap = {}
+    # routing tables in use, replaced as a whole on configuration reload
+    gRoutingTables = {}
+
+    # set from SIGHUP/SIGUSR1 handlers, the reload itself happens in main loop
+    gReloadRequest = {}
+
     mibTreeIdMap = {}
+    mibTreeCacheMap = {}
+    mibTreeRefreshMap = {}
+    mibTreeOptionsMap = {}
+    mibTreeDeadlineMap = {}
+    mibTreeWatchMap = {}
+    mibTreeCfgPathMap = {}
+    mibTreeBreakersMap = {}
+    mibTreeLazyMap = {}
     engineIdMap = {}
+    bindAddressMap = {}
 
-    transportDispatcher = AsyncoreDispatcher()
-    transportDispatcher.registerRoutingCbFun(lambda td, t, d: td)
-    transportDispatcher.setSocketMap()  # use global asyncore socket map
+    # (snmpEngine, transportDomain, bindAddr, transportOptions, batchSize,
+    # socketMode) tuples,
+    # transports are opened once SNMP engines are fully configured
+    transportEndpoints = []
+
+    # (name, object) pairs to periodically report statistics on
+    statsSources = []
+
+    # memoized routing decisions, must be cleared whenever
+    # routing configuration changes
+    routingCacheSize = cfgTree.getAttrValue('routing-cache-size', '', default=ROUTING_CACHE_SIZE, expect=int)
+
+    routingCache = cache.LruCache(routingCacheSize)
+
+    statsSources.append(('routing-cache', routingCache))
+
+    requestDedupWindow = cfgTree.getAttrValue('request-dedup-window', '', default=0, expect=int)
+
+    if requestDedupWindow > 0:
+        requestDeduplicator = dedup.RequestDeduplicator(requestDedupWindow)
+
+        statsSources.append(('request-dedup', requestDeduplicator))
+
+    else:
+        requestDeduplicator = None
+
+    # MIB implementations run their blocking calls here
+    try:
+        sharedExecutor = executor.BoundedExecutor(
+            cfgTree.getAttrValue('executor-pool-size', '', default=EXECUTOR_POOL_SIZE, expect=int),
+            cfgTree.getAttrValue('executor-queue-size', '', default=0, expect=int)
+        )
+
+    except SnmpResponderError:
+        log.error('failed to create shared executor: %s' % sys.exc_info()[1])
+        return
+
+    statsSources.append(('executor', sharedExecutor))
+
+    # REST API backed MIB objects keep their connections alive here
+    sharedHttpClient = httpclient.HttpClient(
+        sharedExecutor,
+        cfgTree.getAttrValue('http-client-max-connections', '', default=HTTP_CLIENT_MAX_CONNECTIONS, expect=int),
+        cfgTree.getAttrValue('http-client-timeout', '', default=HTTP_CLIENT_TIMEOUT, expect=int)
+    )
+
+    statsSources.append(('http-client', sharedHttpClient))
+
+    # CPU-bound MIB objects compute their values in child processes
+    sharedProcessPool = executor.ProcessPool(
+        cfgTree.getAttrValue('process-pool-size', '', default=PROCESS_POOL_SIZE, expect=int)
+    )
+
+    statsSources.append(('process-pool', sharedProcessPool))
+
+    # requests taking MIB trees too long to respond
+    deadlineTracker = deadline.DeadlineTracker()
 
     #
     # Initialize plugin modules
@@ -512,9 +1222,15 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
                 log.error('plugin %s not loaded: %s' % (pluginId, sys.exc_info()[1]))
                 return
 
+    try:
+        checkRoutingTables(routingTables)
+
+    except SnmpResponderError:
+        log.error('configuration error: %s' % sys.exc_info()[1])
+        return
+
     for configEntryPath in cfgTree.getPathsToAttr('snmp-credentials-id'):
         credId = cfgTree.getAttrValue('snmp-credentials-id', *configEntryPath)
-        configKey = []
         log.info('configuring snmp-credentials %s (at %s)...' % (credId, '.'.join(configEntryPath)))
 
         engineId = cfgTree.getAttrValue('snmp-engine-id', *configEntryPath)
@@ -558,19 +1274,18 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
 
             log.info('new engine-id %s' % snmpEngine.snmpEngineID.prettyPrint())
 
-        configKey.append(str(snmpEngine.snmpEngineID))
-
         transportDomain = cfgTree.getAttrValue('snmp-transport-domain', *configEntryPath)
         transportDomain = rfc1902.ObjectName(transportDomain)
 
         if (transportDomain[:len(udp.DOMAIN_NAME)] != udp.DOMAIN_NAME and
-                udp6 and transportDomain[:len(udp6.DOMAIN_NAME)] != udp6.DOMAIN_NAME):
+                not (udp6 and transportDomain[:len(udp6.DOMAIN_NAME)] == udp6.DOMAIN_NAME) and
+                not endpoint.isLocalDomain(transportDomain)):
             log.error('unknown transport domain %s' % (transportDomain,))
             return
 
         if transportDomain in snmpEngineMap['transportDomain']:
             bindAddr, transportDomain = snmpEngineMap['transportDomain'][transportDomain]
-            log.info('using transport endpoint [%s]:%s, transport ID %s' % (bindAddr[0], bindAddr[1], transportDomain))
+            log.info('using transport endpoint %s, transport ID %s' % (endpoint.formatTransportAddress(bindAddr), transportDomain))
 
         else:
             bindAddr = cfgTree.getAttrValue('snmp-bind-address', *configEntryPath)
@@ -585,31 +1300,44 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
                 log.error('bad snmp-bind-address specification %s at %s' % (bindAddr, '.'.join(configEntryPath)))
                 return
 
-            if transportDomain[:len(udp.DOMAIN_NAME)] == udp.DOMAIN_NAME:
-                transport = udp.UdpTransport()
-            else:
-                transport = udp6.Udp6Transport()
+            for transportOption in transportOptions:
+                if transportOption not in ioengine.IO_ENGINES[ioEngineName].TRANSPORT_OPTIONS:
+                    log.error('snmp-transport-options %s at %s not supported by %s I/O engine' % (transportOption, '.'.join(configEntryPath), ioEngineName))
+                    return
 
-            t = transport.openServerMode(bindAddr)
+            batchSize = 0
 
-            if 'transparent-proxy' in transportOptions:
-                t.enablePktInfo()
-                t.enableTransparent()
+            if 'batch-io' in transportOptions:
+                batchSize = cfgTree.getAttrValue('snmp-transport-batch-size', *configEntryPath, default=BATCH_IO_SIZE, expect=int)
 
-            elif 'virtual-interface' in transportOptions:
-                t.enablePktInfo()
+            socketMode = None
 
-            snmpEngine.registerTransportDispatcher(
-                transportDispatcher, transportDomain
-            )
+            if endpoint.isLocalDomain(transportDomain):
+                if 'transparent-proxy' in transportOptions or 'virtual-interface' in transportOptions:
+                    log.error('snmp-transport-options %s at %s not supported by UNIX domain transport' % ('/'.join(transportOptions), '.'.join(configEntryPath)))
+                    return
 
-            config.addSocketTransport(snmpEngine, transportDomain, t)
+                if workersCount > 0:
+                    log.error('UNIX domain transport at %s can not be shared by worker processes' % '.'.join(configEntryPath))
+                    return
+
+                socketMode = cfgTree.getAttrValue('snmp-bind-socket-mode', *configEntryPath, default=None)
+
+                if socketMode is not None:
+                    try:
+                        socketMode = int(socketMode, 8)
+
+                    except ValueError:
+                        log.error('bad snmp-bind-socket-mode %s at %s' % (socketMode, '.'.join(configEntryPath)))
+                        return
+
+            transportEndpoints.append((snmpEngine, transportDomain, bindAddr, transportOptions, batchSize, socketMode))
 
             snmpEngineMap['transportDomain'][transportDomain] = bindAddr, transportDomain
 
-            log.info('new transport endpoint [%s]:%s, options %s, transport ID %s' % (bindAddr[0], bindAddr[1], transportOptions and '/'.join(transportOptions) or '<none>', transportDomain))
+            bindAddressMap[str(transportDomain)] = bindAddr
 
-        configKey.append(transportDomain)
+            log.info('new transport endpoint %s, options %s, transport ID %s' % (endpoint.formatTransportAddress(bindAddr), transportOptions and '/'.join(transportOptions) or '<none>', transportDomain))
 
         securityModel = cfgTree.getAttrValue('snmp-security-model', *configEntryPath)
         securityModel = rfc1902.Integer(securityModel)
@@ -630,10 +1358,6 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
                 log.info('new community-name %s, security-model %s, security-name %s, security-level %s' % (communityName, securityModel, securityName, securityLevel))
                 snmpEngineMap['securityName'][securityName] = securityModel
 
-            configKey.append(securityModel)
-            configKey.append(securityLevel)
-            configKey.append(securityName)
-
         elif securityModel == 3:
             if securityName in snmpEngineMap['securityName']:
                 log.info('using USM security-name: %s' % securityName)
@@ -688,229 +1412,283 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
 
                 snmpEngineMap['securityName'][securityName] = securityModel
 
-            configKey.append(securityModel)
-            configKey.append(securityLevel)
-            configKey.append(securityName)
-
         else:
             raise SnmpResponderError('unknown snmp-security-model: %s' % securityModel)
 
-        configKey = tuple(configKey)
-        if configKey in credIdMap:
-            log.error('ambiguous configuration for key snmp-credentials-id=%s at %s' % (credId, '.'.join(configEntryPath)))
-            return
+    try:
+        routingTables.credIdMap = buildCredIdMap(cfgTree)
+
+    except SnmpResponderError:
+        log.error('configuration error: %s' % sys.exc_info()[1])
+        return
 
-        credIdMap[configKey] = credId
+    # requestObserver picks routing tables from here
+    gRoutingTables['current'] = routingTables
 
-    duplicates = {}
+    mibTreeLoaderPoolSize = cfgTree.getAttrValue('mib-tree-loader-pool-size', '', default=MIB_TREE_LOADER_POOL_SIZE, expect=int)
 
-    for peerCfgPath in cfgTree.getPathsToAttr('snmp-peer-id'):
-        peerId = cfgTree.getAttrValue('snmp-peer-id', *peerCfgPath)
-        if peerId in duplicates:
-            log.error('duplicate snmp-peer-id=%s at %s and %s' % (peerId, '.'.join(peerCfgPath), '.'.join(duplicates[peerId])))
-            return
+    # loads MIB trees in parallel at startup
+    parallelLoader = None
 
-        duplicates[peerId] = peerCfgPath
+    # loads MIB trees on first use, one at a time
+    lazyLoader = None
 
-        log.info('configuring peer ID %s (at %s)...' % (peerId, '.'.join(peerCfgPath)))
-        transportDomain = cfgTree.getAttrValue('snmp-transport-domain', *peerCfgPath)
-        if transportDomain not in peerIdMap:
-            peerIdMap[transportDomain] = []
-        for peerAddress in cfgTree.getAttrValue('snmp-peer-address-pattern-list', *peerCfgPath, vector=True):
-            for bindAddress in cfgTree.getAttrValue('snmp-bind-address-pattern-list', *peerCfgPath, vector=True):
-                peerIdMap[transportDomain].append(
-                    (re.compile(peerAddress+'#'+bindAddress), peerId)
-                )
+    # (mibTreeId, future) pairs of MIB trees being loaded in parallel
+    mibTreeFutures = []
+
+    mibTreesStartedAt = time.time()
+
+    for mibTreeCfgPath in cfgTree.getPathsToAttr('mib-tree-id'):
+
+        mibTreeId = cfgTree.getAttrValue('mib-tree-id', *mibTreeCfgPath)
+
+        log.info('configuring MIB tree ID %s (at %s)...' % (
+            mibTreeId, '.'.join(mibTreeCfgPath)))
 
-    duplicates = {}
+        mibTreeLoadMode = cfgTree.getAttrValue('mib-tree-load-mode', *mibTreeCfgPath, default='sequential')
 
-    for contextCfgPath in cfgTree.getPathsToAttr('snmp-context-id'):
-        contextId = cfgTree.getAttrValue('snmp-context-id', *contextCfgPath)
-        if contextId in duplicates:
-            log.error('duplicate snmp-context-id=%s at %s and %s' % (contextId, '.'.join(contextCfgPath), '.'.join(duplicates[contextId])))
+        if mibTreeLoadMode not in MIB_TREE_LOAD_MODES:
+            log.error('unknown mib-tree-load-mode %s at %s' % (mibTreeLoadMode, '.'.join(mibTreeCfgPath)))
             return
 
-        duplicates[contextId] = contextCfgPath
+        if mibTreeLoadMode == 'lazy' and workersCount > 0:
+            # forked workers share MIB trees loaded before forking
+            log.info('MIB tree ID %s is loaded at startup to be shared by worker processes' % mibTreeId)
+            mibTreeLoadMode = 'sequential'
 
-        k = '#'.join(
-            (cfgTree.getAttrValue('snmp-context-engine-id-pattern', *contextCfgPath),
-             cfgTree.getAttrValue('snmp-context-name-pattern', *contextCfgPath))
+        # managed objects can fail fast while their backend is down
+        circuitBreakers = breaker.CircuitBreakers(
+            cfgTree.getAttrValue('mib-tree-breaker-failure-threshold', *mibTreeCfgPath, default=BREAKER_FAILURE_THRESHOLD, expect=int),
+            cfgTree.getAttrValue('mib-tree-breaker-reset-timeout', *mibTreeCfgPath, default=BREAKER_RESET_TIMEOUT, expect=int)
         )
 
-        log.info('configuring context ID %s (at %s), composite key: %s' % (contextId, '.'.join(contextCfgPath), k))
+        # changes to MIB implementations made after this point get noticed
+        mibTreeWatchMap[mibTreeId] = watcher.FileWatcher(
+            getMibCodePatternPaths(mibTreeCfgPath),
+            cfgTree.getAttrValue('mib-tree-watch-interval', *mibTreeCfgPath, default=0, expect=int)
+        )
+
+        mibTreeCfgPathMap[mibTreeId] = mibTreeCfgPath
+        mibTreeBreakersMap[mibTreeId] = circuitBreakers
 
-        contextIdList.append((contextId, re.compile(k)))
+        try:
+            if mibTreeLoadMode == 'parallel' and parallelLoader is None:
+                parallelLoader = executor.BoundedExecutor(mibTreeLoaderPoolSize)
 
-    duplicates = {}
+            elif mibTreeLoadMode == 'lazy' and lazyLoader is None:
+                # thread starts on first use i.e. in the daemon process
+                lazyLoader = executor.BoundedExecutor(1)
 
-    for contentCfgPath in cfgTree.getPathsToAttr('snmp-content-id'):
-        contentId = cfgTree.getAttrValue('snmp-content-id', *contentCfgPath)
-        if contentId in duplicates:
-            log.error('duplicate snmp-content-id=%s at %s and %s' % (contentId, '.'.join(contentCfgPath), '.'.join(duplicates[contentId])))
+        except SnmpResponderError:
+            log.error('failed to create MIB tree loader: %s' % sys.exc_info()[1])
             return
 
-        duplicates[contentId] = contentCfgPath
+        if mibTreeLoadMode == 'parallel':
+            mibTreeFutures.append(
+                (mibTreeId, parallelLoader.submit(loadMibTree, mibTreeId, mibTreeCfgPath, circuitBreakers)))
 
-        for x in cfgTree.getAttrValue('snmp-pdu-oid-prefix-pattern-list', *contentCfgPath, vector=True):
-            k = '#'.join([cfgTree.getAttrValue('snmp-pdu-type-pattern', *contentCfgPath), x])
+        elif mibTreeLoadMode == 'lazy':
+            mibTreeLazyMap[mibTreeId] = mibtree.LazyMibTree(
+                mibTreeId, MIB_TREE_LOAD_RETRY_INTERVAL, lazyLoader, loadMibTree, mibTreeId, mibTreeCfgPath, circuitBreakers)
 
-            log.info('configuring content ID %s (at %s), composite key: %s' % (contentId, '.'.join(contentCfgPath), k))
+            mibTreeIdMap[mibTreeId] = mibTreeLazyMap[mibTreeId]
 
-            contentIdList.append((contentId, re.compile(k)))
+        else:
+            installMibTree(mibTreeId, *loadMibTree(mibTreeId, mibTreeCfgPath, circuitBreakers))
 
-    del duplicates
+        statsSources.append(('mib-tree-id %s circuit breakers' % mibTreeId, circuitBreakers))
 
-    for pluginCfgPath in cfgTree.getPathsToAttr('using-plugin-id-list'):
-        pluginIdList = cfgTree.getAttrValue('using-plugin-id-list', *pluginCfgPath, vector=True)
-        log.info('configuring plugin ID(s) %s (at %s)...' % (','.join(pluginIdList), '.'.join(pluginCfgPath)))
-        for credId in cfgTree.getAttrValue('matching-snmp-credentials-id-list', *pluginCfgPath, vector=True):
-            for peerId in cfgTree.getAttrValue('matching-snmp-peer-id-list', *pluginCfgPath, vector=True):
-                for contextId in cfgTree.getAttrValue('matching-snmp-context-id-list', *pluginCfgPath, vector=True):
-                    for contentId in cfgTree.getAttrValue('matching-snmp-content-id-list', *pluginCfgPath, vector=True):
-                        k = credId, contextId, peerId, contentId
-                        if k in pluginIdMap:
-                            log.error('duplicate snmp-credentials-id %s, snmp-context-id %s, snmp-peer-id %s, snmp-content-id %s at plugin-id(s) %s' % (credId, contextId, peerId, contentId, ','.join(pluginIdList)))
-                            return
-                        else:
-                            log.info('configuring plugin(s) %s (at %s), composite key: %s' % (','.join(pluginIdList), '.'.join(pluginCfgPath), '/'.join(k)))
-
-                            for pluginId in pluginIdList:
-                                if not pluginManager.hasPlugin(pluginId):
-                                    log.error('undefined plugin ID %s referenced at %s' % (pluginId, '.'.join(pluginCfgPath)))
-                                    return
-
-                            pluginIdMap[k] = pluginIdList
-
-    for routeCfgPath in cfgTree.getPathsToAttr('using-mib-tree-id'):
-        mibTreeId = cfgTree.getAttrValue('using-mib-tree-id', *routeCfgPath)
-        log.info('configuring destination MIB tree ID(s) %s (at %s)...' % (mibTreeId, '.'.join(routeCfgPath)))
-        for credId in cfgTree.getAttrValue('matching-snmp-credentials-id-list', *routeCfgPath, vector=True):
-            for peerId in cfgTree.getAttrValue('matching-snmp-peer-id-list', *routeCfgPath, vector=True):
-                for contextId in cfgTree.getAttrValue('matching-snmp-context-id-list', *routeCfgPath, vector=True):
-                    for contentId in cfgTree.getAttrValue('matching-snmp-content-id-list', *routeCfgPath, vector=True):
-                        k = credId, contextId, peerId, contentId
-                        if k in routingMap:
-                            log.error('duplicate snmp-credentials-id %s, snmp-context-id %s, snmp-peer-id %s, snmp-content-id %s at mib-tree-id(s) %s' % (credId, contextId, peerId, contentId, ','.join(mibTreeIdList)))
-                            return
-                        else:
-                            routingMap[k] = mibTreeId
+        mibTreeOptions = cfgTree.getAttrValue('mib-tree-options', *mibTreeCfgPath, default=[], vector=True)
 
-                        log.info('configuring MIB tree routing to %s (at %s), composite key: %s' % (mibTreeId, '.'.join(routeCfgPath), '/'.join(k)))
+        for mibTreeOption in mibTreeOptions:
+            if mibTreeOption not in MIB_TREE_OPTIONS:
+                log.error('unknown mib-tree-options %s at %s' % (mibTreeOption, '.'.join(mibTreeCfgPath)))
+                return
 
-    for mibTreeCfgPath in cfgTree.getPathsToAttr('mib-tree-id'):
+        mibTreeOptionsMap[mibTreeId] = mibTreeOptions
 
-        mibTreeId = cfgTree.getAttrValue('mib-tree-id', *mibTreeCfgPath)
+        requestTimeout = cfgTree.getAttrValue('mib-tree-request-deadline', *mibTreeCfgPath, default=0, expect=float)
 
-        log.info('configuring MIB tree ID %s (at %s)...' % (
-            mibTreeId, '.'.join(mibTreeCfgPath)))
+        if requestTimeout > 0:
+            deadlineAction = cfgTree.getAttrValue('mib-tree-deadline-action', *mibTreeCfgPath, default='gen-err')
 
-        mibTextPaths = cfgTree.getAttrValue(
-            'mib-text-search-path-list', *mibTreeCfgPath,
-            default=[], vector=True)
+            if deadlineAction not in DEADLINE_ACTIONS:
+                log.error('unknown mib-tree-deadline-action %s at %s' % (deadlineAction, '.'.join(mibTreeCfgPath)))
+                return
 
-        mibCodePatternPaths = macro.expandMacros(
-            cfgTree.getAttrValue('mib-code-modules-pattern-list', *mibTreeCfgPath, default=[], vector=True),
-            {'config-dir': os.path.dirname(cfgFile)}
-        )
+            mibTreeDeadlineMap[mibTreeId] = requestTimeout, deadlineAction
 
-        mibBuilder = builder.MibBuilder()
+            log.info('MIB tree ID %s requests deadline is %s seconds' % (mibTreeId, requestTimeout))
 
-        compiler.addMibCompiler(mibBuilder, sources=mibTextPaths)
+        mibTreeCacheTtls = cfgTree.getAttrValue('mib-tree-cache-ttl-list', *mibTreeCfgPath, default=[], vector=True)
 
-        for topDir in mibCodePatternPaths:
+        if mibTreeCacheTtls:
+            try:
+                mibTreeCacheMap[mibTreeId] = mibcache.MibTreeCache.fromConfig(
+                    mibTreeCacheTtls,
+                    cfgTree.getAttrValue('mib-tree-cache-size', *mibTreeCfgPath, default=MIB_TREE_CACHE_SIZE, expect=int)
+                )
 
-            filenameRegExp = re.compile(os.path.basename(topDir))
-            topDir = os.path.dirname(topDir)
+            except SnmpResponderError:
+                log.error('bad mib-tree-cache-ttl-list at %s: %s' % ('.'.join(mibTreeCfgPath), sys.exc_info()[1]))
+                return
 
-            for root, dirs, files in os.walk(topDir):
+            statsSources.append(('mib-tree-id %s cache' % mibTreeId, mibTreeCacheMap[mibTreeId]))
 
-                if not files or root.endswith('__pycache__'):
-                    continue
+            log.info('caching MIB tree ID %s var-binds for %s' % (mibTreeId, ', '.join(mibTreeCacheTtls)))
 
-                mibBuilder.setMibSources(
-                    builder.DirMibSource(root), *mibBuilder.getMibSources()
-                )
+    if parallelLoader is not None:
+        try:
+            for mibTreeId, future in mibTreeFutures:
+                installMibTree(mibTreeId, *future.result())
 
-                for filename in files:
+        finally:
+            # no threads may be left before forking
+            parallelLoader.shutdown()
 
-                    if not filenameRegExp.match(filename):
-                        log.debug('skipping non-matching file %s while loading '
-                                  'MIB tree ID %s' % (filename, mibTreeId))
-                        continue
+    log.info('loaded %s MIB tree(s) in %.3f seconds, %s more to load on first use' % (
+        len(mibTreeIdMap) - len(mibTreeLazyMap), time.time() - mibTreesStartedAt, len(mibTreeLazyMap)))
 
-                    module, _ = os.path.splitext(filename)
+    if mibTreeDeadlineMap:
+        statsSources.append(('request-deadline', deadlineTracker))
 
-                    try:
-                        mibBuilder.loadModule(module)
+    def startIoEngine(reusePort=False):
+        ioEngine = ioengine.getIoEngine(ioEngineName)
 
-                    except PySnmpError as ex:
-                        log.error('fail to load MIB implementation from file '
-                                  '%s into MIB tree ID %s' % (
-                            os.path.join(root, filename), mibTreeId))
-                        raise SnmpResponderError(str(ex))
+        transportDispatcher = ioEngine.transportDispatcher
+        transportDispatcher.registerRoutingCbFun(lambda td, t, d: td)
 
-                    log.info('loaded MIB implementation file %s into MIB tree '
-                             'ID %s' % (os.path.join(root, filename), mibTreeId))
+        for snmpEngine, transportDomain, bindAddr, transportOptions, batchSize, socketMode in transportEndpoints:
+            transport = ioEngine.getTransport(transportDomain, batchSize)
 
-        mibCodePackages = macro.expandMacros(
-            cfgTree.getAttrValue('mib-code-packages-pattern-list', *mibTreeCfgPath, default=[], vector=True),
-            {'config-dir': os.path.dirname(cfgFile)}
-        )
+            t = ioEngine.openServerMode(transport, bindAddr, reusePort=reusePort, socketMode=socketMode)
 
-        for mibCodePackage in mibCodePackages:
+            if 'transparent-proxy' in transportOptions:
+                t.enablePktInfo()
+                t.enableTransparent()
 
-            mibCodePackageRegExp = re.compile(mibCodePackage)
+            elif 'virtual-interface' in transportOptions:
+                t.enablePktInfo()
 
-            for entryPoint in pkg_resources.iter_entry_points('snmpresponder.mibs'):
-                log.debug('found extension entry point %s' % entryPoint.name)
+            snmpEngine.registerTransportDispatcher(
+                transportDispatcher, transportDomain
+            )
 
-                mibPackage = entryPoint.load()
+            config.addSocketTransport(snmpEngine, transportDomain, t)
 
-                root = os.path.dirname(mibPackage.__file__)
+            log.debug('transport endpoint %s, transport ID %s is open' % (endpoint.formatTransportAddress(bindAddr), transportDomain))
 
-                mibPathSet = False
+        return ioEngine
 
-                for filename in os.listdir(root):
+    def runIoEngine(ioEngine):
+        transportDispatcher = ioEngine.transportDispatcher
 
-                    if filename.startswith('__init__'):
-                        continue
+        if statsLoggingInterval > 0:
 
-                    if not os.path.isfile(os.path.join(root, filename)):
-                        continue
+            def statsLoggingCbFun(timeNow):
+                for statsName, statsSource in statsSources:
+                    log.info('%s stats: %s' % (statsName, ', '.join(
+                        ['%s=%s' % x for x in sorted(statsSource.getStats().items())])))
 
-                    mibPath = '.'.join((entryPoint.name, filename))
+            transportDispatcher.registerTimerCbFun(statsLoggingCbFun, statsLoggingInterval)
 
-                    if not mibCodePackageRegExp.match(mibPath):
-                        log.debug('extension MIB %s from %s is NOT configured, '
-                                  'skipping' % (mibPath, entryPoint.name))
-                        continue
+        # reloaded MIB trees may start refreshing their objects
+        def refreshCbFun(timeNow):
+            for refreshScheduler in mibTreeRefreshMap.values():
+                refreshScheduler.tick(timeNow)
 
-                    if not mibPathSet:
-                        mibBuilder.setMibSources(
-                            builder.DirMibSource(root), *mibBuilder.getMibSources()
-                        )
-                        mibPathSet = True
+        transportDispatcher.registerTimerCbFun(refreshCbFun, REFRESH_TICK_INTERVAL)
 
-                    log.debug('loading extension MIB %s from %s into MIB tree '
-                              'ID %s' % (mibPath, entryPoint.name, mibTreeId))
+        def watchCbFun(timeNow):
+            for mibTreeId, fileWatcher in list(mibTreeWatchMap.items()):
+                changedFiles = fileWatcher.tick(timeNow)
+                if changedFiles:
+                    reloadMibTree(mibTreeId, changedFiles)
 
-                    module, _ = os.path.splitext(filename)
+        transportDispatcher.registerTimerCbFun(watchCbFun, MIB_TREE_WATCH_TICK_INTERVAL)
+
+        if mibTreeDeadlineMap:
+            transportDispatcher.registerTimerCbFun(deadlineTracker.expire, DEADLINE_TICK_INTERVAL)
+
+        if mibTreeLazyMap:
+            transportDispatcher.registerTimerCbFun(
+                lambda timeNow: resumeLazyMibTrees(), MIB_TREE_LOAD_TICK_INTERVAL)
+
+        if hasattr(signal, 'SIGHUP'):
+
+            # the signal may come in the middle of request processing
+            def sighupCbFun(signum, frame):
+                gReloadRequest['config'] = True
+
+            def sigusr1CbFun(signum, frame):
+                gReloadRequest['mib-trees'] = True
+
+            signal.signal(signal.SIGHUP, sighupCbFun)
+            signal.signal(signal.SIGUSR1, sigusr1CbFun)
+
+            def reloadCbFun(timeNow):
+                if gReloadRequest.pop('config', None):
+                    reloadConfig()
 
+                if gReloadRequest.pop('mib-trees', None):
+                    reloadChangedMibTrees()
+
+            transportDispatcher.registerTimerCbFun(reloadCbFun, RELOAD_CHECK_INTERVAL)
+
+        log.info('starting %s I/O engine...' % ioEngineName)
+
+        transportDispatcher.jobStarted(1)  # server job would never finish
+
+        with daemon.PrivilegesOf(procUser, procGroup, final=True):
+
+            try:
+                while True:
                     try:
-                        mibBuilder.loadModule(module)
+                        transportDispatcher.runDispatcher()
 
-                    except PySnmpError as ex:
-                        log.error('fail to load MIB implementation %s from '
-                                  '%s into MIB tree ID %s' % (mibPath, entryPoint.name,
-                                                              mibTreeId))
-                        raise SnmpResponderError(str(ex))
+                    except (PySnmpError, SnmpResponderError, socket.error):
+                        log.error(str(sys.exc_info()[1]))
+                        continue
 
-                    log.info('loaded MIB implementation %s from %s into MIB tree '
-                             'ID %s' % (mibPath, entryPoint.name, mibTreeId))
+                    except Exception:
+                        transportDispatcher.closeDispatcher()
+                        raise
 
-        mibTreeIdMap[mibTreeId] = instrum.MibInstrumController(mibBuilder)
+            finally:
+                # do not leave child processes behind
+                sharedProcessPool.shutdown(wait=False)
+
+    def workerFun(workerIdx):
+        try:
+            runIoEngine(startIoEngine(reusePort=True))
 
-        log.info('loaded new MIB tree ID %s' % mibTreeId)
+        except KeyboardInterrupt:
+            log.info('shutting down worker #%s...' % workerIdx)
+            return 0
+
+        except (PySnmpError, SnmpResponderError):
+            log.error('worker #%s failed: %s' % (workerIdx, sys.exc_info()[1]))
+            return 1
+
+        except Exception:
+            for line in traceback.format_exception(*sys.exc_info()):
+                log.error(line.replace('\n', ';'))
+            return 1
+
+    statsLoggingInterval = cfgTree.getAttrValue('stats-logging-interval', '', default=0, expect=int)
+
+    if workersCount > 0:
+        # transports are opened by each worker, kernel distributes
+        # datagrams among them
+        ioEngine = None
+
+    else:
+        try:
+            ioEngine = startIoEngine()
+
+        except (PySnmpError, SnmpResponderError):
+            log.error('I/O engine initialization error: %s' % sys.exc_info()[1])
+            return
 
     if not foregroundFlag:
         try:
@@ -922,23 +1700,25 @@ Software documentation and support at http://snmplabs.com/snmpresponder/
 
     # Run mainloop
 
-    log.info('starting I/O engine...')
-
-    transportDispatcher.jobStarted(1)  # server job would never finish
+    if ioEngine:
+        runIoEngine(ioEngine)
+        return
 
-    with daemon.PrivilegesOf(procUser, procGroup, final=True):
+    freeze = getattr(gc, 'freeze', None)
+    if freeze:
+        # keep MIB trees off the garbage collector so that workers
+        # share memory pages with master copy-on-write
+        gc.collect()
+        freeze()
 
-        while True:
-            try:
-                transportDispatcher.runDispatcher()
+    log.info('starting %s worker processes...' % workersCount)
 
-            except (PySnmpError, SnmpResponderError, socket.error):
-                log.error(str(sys.exc_info()[1]))
-                continue
+    try:
+        daemon.runWorkers(workersCount, workerFun)
 
-            except Exception:
-                transportDispatcher.closeDispatcher()
-                raise
+    except SnmpResponderError:
+        log.error('worker processes failure: %s' % sys.exc_info()[1])
+        return
 
 
 if __name__ == '__main__':
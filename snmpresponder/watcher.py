@@ -0,0 +1,95 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import os
+import re
+
+
+class FileWatcher(object):
+    """Notice changes to MIB implementation files.
+
+    Watches files matching *patternPaths* (directory followed by file
+    name regular expression, the same as `mib-code-modules-pattern-list`
+    option takes). Files are compared by their modification time and
+    size, added and removed files count as changed too.
+
+    With non-zero *interval*, `tick()` (periodically called from the
+    main loop) checks for changes every *interval* seconds.
+    """
+    def __init__(self, patternPaths, interval=0):
+        self._patternPaths = patternPaths
+        self._interval = interval
+        self._nextCheck = None
+        self._files = self.scan()
+        self.checks = 0
+        self.changes = 0
+
+    def scan(self):
+        """Return {path: (mtime, size)} of currently watched files"""
+        files = {}
+
+        for topDir in self._patternPaths:
+
+            filenameRegExp = re.compile(os.path.basename(topDir))
+            topDir = os.path.dirname(topDir)
+
+            for root, dirs, filenames in os.walk(topDir):
+
+                if root.endswith('__pycache__'):
+                    continue
+
+                for filename in filenames:
+                    if not filenameRegExp.match(filename):
+                        continue
+
+                    path = os.path.join(root, filename)
+
+                    try:
+                        st = os.stat(path)
+
+                    except OSError:
+                        # removed meanwhile
+                        continue
+
+                    files[path] = st.st_mtime, st.st_size
+
+        return files
+
+    def changed(self):
+        """Return sorted list of files changed since the previous call"""
+        files = self.scan()
+
+        changedFiles = [path for path in set(files).union(self._files)
+                        if files.get(path) != self._files.get(path)]
+
+        self._files = files
+
+        self.checks += 1
+        self.changes += len(changedFiles)
+
+        return sorted(changedFiles)
+
+    def tick(self, timeNow):
+        """Return files changed if it's time to check them, else empty list"""
+        if not self._interval:
+            return []
+
+        if self._nextCheck is None:
+            self._nextCheck = timeNow + self._interval
+
+        if timeNow < self._nextCheck:
+            return []
+
+        self._nextCheck = timeNow + self._interval
+
+        return self.changed()
+
+    def getStats(self):
+        return {
+            'files': len(self._files),
+            'checks': self.checks,
+            'changes': self.changes
+        }
@@ -0,0 +1,154 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import time
+import unittest
+
+try:
+    from concurrent import futures
+
+except ImportError:
+    futures = None
+
+from snmpresponder import breaker
+from snmpresponder.error import CircuitOpenError
+
+
+def fail():
+    raise RuntimeError('backend down')
+
+
+@unittest.skipIf(futures is None, 'concurrent.futures not available')
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = breaker.CircuitBreaker('test', 2, 0.1)
+
+    def _trip(self):
+        for _ in range(2):
+            self.breaker.submit(futures.Future).set_exception(RuntimeError())
+
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+    def testTripAndReject(self):
+        self._trip()
+
+        future = self.breaker.submit(futures.Future)
+
+        self.assertIsInstance(future.exception(), CircuitOpenError)
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def testProbeSucceeds(self):
+        self._trip()
+
+        time.sleep(0.1)
+
+        probe = self.breaker.submit(futures.Future)
+
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+        # one probe at a time
+        self.assertFalse(self.breaker.allow())
+
+        probe.set_result(None)
+
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def testSyncFailureCounted(self):
+        for _ in range(2):
+            self.assertRaises(RuntimeError, self.breaker.submit, fail)
+
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+    def testSyncFailureOfProbe(self):
+        self._trip()
+
+        time.sleep(0.1)
+
+        self.assertRaises(RuntimeError, self.breaker.submit, fail)
+
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+        self.assertEqual(self.breaker.trips, 2)
+
+        time.sleep(0.1)
+
+        self.breaker.submit(futures.Future).set_result(None)
+
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def testProbeTimeout(self):
+        self._trip()
+
+        time.sleep(0.1)
+
+        stuckProbe = self.breaker.submit(futures.Future)
+
+        time.sleep(0.1)
+
+        # timed out probe re-opens the breaker
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+        self.assertEqual(self.breaker.trips, 2)
+
+        time.sleep(0.1)
+
+        probe = self.breaker.submit(futures.Future)
+
+        # outcome of the timed out probe does not count
+        stuckProbe.set_result(None)
+
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+        probe.set_exception(RuntimeError())
+
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+    def testLateOutcomeIgnored(self):
+        # calls made before the breaker trips
+        lateCalls = [self.breaker.submit(futures.Future) for _ in range(3)]
+
+        self._trip()
+
+        lateCalls[0].set_result(None)
+
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+        time.sleep(0.1)
+
+        probe = self.breaker.submit(futures.Future)
+
+        lateCalls[1].set_result(None)
+        lateCalls[2].set_exception(RuntimeError())
+
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+        self.assertEqual(self.breaker.trips, 1)
+
+        probe.set_result(None)
+
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def testManualProbe(self):
+        self._trip()
+
+        time.sleep(0.1)
+
+        allowed, probeId = self.breaker.admit()
+
+        self.assertTrue(allowed)
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+        # not a probe
+        self.breaker.success()
+
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+        self.breaker.success(probeId)
+
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
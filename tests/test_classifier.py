@@ -0,0 +1,48 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import unittest
+
+from snmpresponder import classifier
+
+
+class IsPortAgnosticTestCase(unittest.TestCase):
+
+    def testWildcard(self):
+        for pattern in ('.*', '.*?', '.*$'):
+            self.assertTrue(classifier.isPortAgnostic(pattern), pattern)
+
+    def testLiteralPrefix(self):
+        for pattern in (r'10\.113\..*?', r'127\.0\.0\.1.*'):
+            self.assertTrue(classifier.isPortAgnostic(pattern), pattern)
+
+    def testAnyPort(self):
+        for pattern in (r'127\.0\.0\.1:.*', r'127\.0\.0\.1:.*?$',
+                        r'127\.0\.0\.1\:\d+', r'127\.0\.0\.[2-3]:[0-9]+?',
+                        r'(10\.0\.0\.1|10\.0\.0\.2):.*'):
+            self.assertTrue(classifier.isPortAgnostic(pattern), pattern)
+
+    def testPortPrefix(self):
+        for pattern in (r'127\.0\.0\.1:16.*', r'10\.0\.0\.1:1.*',
+                        r'10\.0\.0\.1:161', r'10\.0\.0\.1:\d',
+                        r'10\.0\.0\.1.1.*', r'10\.0\.0\.\d+.1.*'):
+            self.assertFalse(classifier.isPortAgnostic(pattern), pattern)
+
+    def testPortInAlternation(self):
+        for pattern in (r'(10\.0\.0\.1:161|10\.0\.0\.2).*',
+                        r'10\.0\.0\.1:161|10\.0\.0\.2:.*'):
+            self.assertFalse(classifier.isPortAgnostic(pattern), pattern)
+
+    def testPortInLookahead(self):
+        self.assertFalse(classifier.isPortAgnostic(r'10\.0\.0\.1(?=:161):.*'))
+
+    def testNoPort(self):
+        for pattern in (r'127\.0\.0\.1', r'(10\.0\.0\.1).*', r'[:].*'):
+            self.assertFalse(classifier.isPortAgnostic(pattern), pattern)
+
+
+if __name__ == '__main__':
+    unittest.main()
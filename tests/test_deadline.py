@@ -0,0 +1,120 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import time
+import unittest
+
+try:
+    import asyncio
+
+except ImportError:
+    asyncio = None
+
+from snmpresponder.deadline import DeadlineTracker
+
+
+class DeadlineTrackerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.tracker = DeadlineTracker(clock=lambda: self.now)
+        self.expired = []
+
+    def _add(self, deadline, name):
+        return self.tracker.add(deadline, self.expired.append, name)
+
+    def _expire(self, now):
+        self.now = now
+        self.tracker.expire()
+
+    def testExpireInDeadlineOrder(self):
+        self._add(30, 'c')
+        self._add(10, 'a')
+        self._add(20, 'b')
+        self._add(40, 'd')
+
+        self._expire(5)
+        self.assertEqual(self.expired, [])
+
+        self._expire(30)
+        self.assertEqual(self.expired, ['a', 'b', 'c'])
+        self.assertEqual(len(self.tracker), 1)
+
+        stats = self.tracker.getStats()
+
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['expired'], 3)
+
+    def testSameDeadline(self):
+        self._add(10, 'a')
+        self._add(10, 'b')
+
+        self._expire(10)
+        self.assertEqual(sorted(self.expired), ['a', 'b'])
+
+    def testRemovedNotExpired(self):
+        token = self._add(10, 'a')
+        self._add(20, 'b')
+
+        self.assertTrue(self.tracker.remove(token))
+
+        self._expire(20)
+        self.assertEqual(self.expired, ['b'])
+        self.assertEqual(self.tracker.getStats()['expired'], 1)
+
+    def testExpiredNotRemoved(self):
+        token = self._add(10, 'a')
+
+        self._expire(10)
+
+        self.assertFalse(self.tracker.remove(token))
+        self.assertEqual(self.tracker.getStats()['discarded'], 1)
+
+    def testExpireAtTimeZero(self):
+        self._add(0, 'a')
+
+        self._expire(0)
+        self.assertEqual(self.expired, ['a'])
+
+    def testRemovedCompacted(self):
+        count = 3 * (self.tracker.COMPACT_THRESHOLD + 1)
+
+        tokens = [self._add(idx, idx) for idx in range(count)]
+
+        for token in tokens[1:]:
+            self.tracker.remove(token)
+
+        self.assertLess(len(self.tracker._deadlines), count)
+
+        self._expire(count)
+        self.assertEqual(self.expired, [0])
+
+    @unittest.skipIf(asyncio is None, 'asyncio not available')
+    def testExpireOnAsyncioTick(self):
+        tracker = DeadlineTracker()
+
+        tracker.add(time.time() - 1, self.expired.append, 'a')
+        tracker.add(time.time() + 100, self.expired.append, 'b')
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            # asyncio dispatcher ticks with monotonic loop time
+            tracker.expire(loop.time())
+
+        finally:
+            loop.close()
+
+        self.assertEqual(self.expired, ['a'])
+
+        # whatever the tick time is, deadlines are wall-clock
+        tracker.expire(time.time() + 1000)
+
+        self.assertEqual(self.expired, ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import json
+import socket
+import threading
+import time
+import unittest
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+try:
+    from concurrent import futures
+
+except ImportError:
+    futures = None
+
+from snmpresponder.httpclient import HttpClient, HttpError
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Stand-in REST API server"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+
+        if self.path == '/missing':
+            self._respond(404, b'')
+            return
+
+        if self.path == '/slow':
+            time.sleep(1)
+
+        self._respond(200, json.dumps({'path': self.path}).encode('utf-8'))
+
+        if self.path == '/drop':
+            # keep-alive promised, yet connection goes away
+            self.close_connection = True
+
+    do_POST = do_GET
+
+    def do_HEAD(self):
+        self.server.connections.add(self.client_address)
+
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _respond(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), RequestHandler)
+        self.connections = set()
+
+
+class HttpClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HttpServer()
+        self.url = 'http://127.0.0.1:%s' % self.server.server_address[1]
+
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.client = HttpClient(maxConnections=2, timeout=0.5)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _dropConnection(self, method='GET'):
+        self.client.request(method, self.url + '/drop')
+
+        # let the server close its end of the idle connection
+        time.sleep(0.1)
+
+    def testKeepAliveReuse(self):
+        for idx in range(10):
+            self.assertEqual(
+                self.client.getJson(self.url + '/x?idx=%s' % idx),
+                {'path': '/x?idx=%s' % idx})
+
+        self.assertEqual(len(self.server.connections), 1)
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['requests'], 10)
+        self.assertEqual(stats['reused'], 9)
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['failures'], 0)
+
+    def testStaleGetRetried(self):
+        self._dropConnection()
+
+        self.assertEqual(self.client.getJson(self.url + '/x'), {'path': '/x'})
+
+        self.assertEqual(len(self.server.connections), 2)
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['failures'], 0)
+
+    def testStaleHeadRetried(self):
+        self._dropConnection()
+
+        status, headers, body = self.client.request('HEAD', self.url + '/x')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.server.connections), 2)
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['failures'], 0)
+
+    def testStalePostNotRetried(self):
+        self._dropConnection('POST')
+
+        self.assertRaises(HttpError, self.client.request, 'POST', self.url + '/x', b'{}')
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['connections'], 0)
+
+    def testTimeoutNotRetried(self):
+        self.client.getJson(self.url + '/x')
+
+        self.assertRaises(HttpError, self.client.getJson, self.url + '/slow')
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['connections'], 0)
+
+    def testHttpErrorStatus(self):
+        self.assertRaises(HttpError, self.client.getJson, self.url + '/missing')
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['failures'], 1)
+        # the connection is still good
+        self.assertEqual(stats['connections'], 1)
+
+    def testConnectionRefused(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:%s/x' % sock.getsockname()[1]
+        sock.close()
+
+        self.assertRaises(HttpError, self.client.getJson, url)
+
+        stats = self.client.getStats()
+
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['connections'], 0)
+
+    def testUnsupportedUrl(self):
+        self.assertRaises(HttpError, self.client.request, 'GET', 'ftp://127.0.0.1/x')
+
+    @unittest.skipIf(futures is None, 'concurrent.futures not available')
+    def testConcurrentRequests(self):
+        executor = futures.ThreadPoolExecutor(8)
+
+        try:
+            client = HttpClient(executor, maxConnections=2, timeout=5)
+
+            results = [client.submitJson(self.url + '/x?idx=%s' % idx)
+                       for idx in range(50)]
+
+            for idx, future in enumerate(results):
+                self.assertEqual(future.result(), {'path': '/x?idx=%s' % idx})
+
+        finally:
+            executor.shutdown()
+
+        stats = client.getStats()
+
+        self.assertEqual(stats['requests'], 50)
+        self.assertEqual(stats['requests'] - stats['reused'], stats['created'])
+        self.assertLessEqual(stats['created'], 2)
+        self.assertEqual(stats['failures'], 0)
+
+    def testNoExecutor(self):
+        self.assertRaises(HttpError, self.client.submitJson, self.url + '/x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#
+# This file is part of snmpresponder software.
+#
+# Copyright (c) 2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpresponder/license.html
+#
+import unittest
+
+from snmpresponder.refresh import RefreshScheduler
+from snmpresponder.error import SnmpResponderError
+
+
+class RefreshSchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000
+        self.fetches = []
+        self.values = []
+        self.errors = []
+
+    def _scheduler(self, refreshInterval, maxStaleness=0, fetchTimeout=60):
+        return RefreshScheduler(refreshInterval, maxStaleness, fetchTimeout,
+                                clock=lambda: self.now)
+
+    def _read(self, value, error=None):
+        if error is None:
+            self.values.append(value)
+
+        else:
+            self.errors.append(error)
+
+    def testServeLastKnownValue(self):
+        scheduler = self._scheduler(10)
+        scheduler.register('x', self.fetches.append)
+
+        scheduler.read('x', self._read)
+        self.assertEqual(len(self.fetches), 1)
+
+        self.fetches.pop()(1)
+        self.assertEqual(self.values, [1])
+
+        self.now += 10
+        scheduler.tick()
+        self.assertEqual(len(self.fetches), 1)
+
+        # stale value is served while refreshing
+        scheduler.read('x', self._read)
+        self.assertEqual(self.values, [1, 1])
+
+    def testZeroIntervalsConfigured(self):
+        scheduler = self._scheduler(10, 30)
+        scheduler.register('x', self.fetches.append, refreshInterval=0, maxStaleness=0)
+
+        scheduler.tick()
+        self.fetches.pop()(1)
+
+        # refreshed on every tick, never too stale to serve
+        scheduler.tick()
+        self.assertEqual(len(self.fetches), 1)
+
+        self.now += 1000
+        scheduler.read('x', self._read)
+        self.assertEqual(self.values, [1])
+
+    def testTickTimeIgnored(self):
+        scheduler = self._scheduler(10)
+        scheduler.register('x', self.fetches.append)
+
+        scheduler.tick()
+        self.fetches.pop()(1)
+
+        # e.g. monotonic time of asyncio loop
+        scheduler.tick(self.now + 1000)
+        self.assertEqual(self.fetches, [])
+
+    def testStuckFetchTimesOut(self):
+        scheduler = self._scheduler(10, fetchTimeout=5)
+        scheduler.register('x', self.fetches.append)
+
+        scheduler.read('x', self._read)
+        stuckFetch = self.fetches.pop()
+
+        self.now += 5
+        scheduler.tick()
+        self.assertEqual(self.errors, [])
+
+        self.now += 1
+        scheduler.tick()
+        self.assertEqual(len(self.errors), 1)
+        self.assertIsInstance(self.errors[0], SnmpResponderError)
+
+        # retried on next tick, late completion does not count
+        scheduler.tick()
+        self.assertEqual(len(self.fetches), 1)
+
+        stuckFetch(1)
+        self.assertEqual(scheduler.getStats()['refreshes'], 0)
+
+        self.fetches.pop()(2)
+        scheduler.read('x', self._read)
+        self.assertEqual(self.values, [2])
+
+    def testStaleValueNotServed(self):
+        scheduler = self._scheduler(10, 30)
+        scheduler.register('x', self.fetches.append)
+
+        scheduler.tick()
+        self.fetches.pop()(1)
+
+        self.now += 30
+        scheduler.read('x', self._read)
+        self.assertEqual(self.values, [])
+
+        self.fetches.pop()(2)
+        self.assertEqual(self.values, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()